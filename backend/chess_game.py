@@ -1,7 +1,7 @@
-from typing import Optional, List, Tuple, Dict, Set
+from typing import Optional, List, Tuple, Dict, Set, Iterator, ClassVar, Callable
 from enum import Enum
 from dataclasses import dataclass
-from copy import deepcopy
+import json
 import random
 
 
@@ -35,15 +35,31 @@ class Color(Enum):
         return Color.BLACK if self == Color.WHITE else Color.WHITE
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Position:
-    """Represents a position on the chess board."""
+    """
+    Represents a position on the chess board.
+
+    Positions are immutable, and the 64 on-board squares are interned:
+    Position(row, col) returns the same instance every time. Off-board
+    positions (produced by offset arithmetic) are created normally.
+    """
 
     row: int  # 0-7, where 0 is rank 1 (white's back rank)
     col: int  # 0-7, where 0 is 'a' file
 
+    _interned: ClassVar[Tuple["Position", ...]] = ()
+
+    def __new__(cls, row: int, col: int) -> "Position":
+        if cls._interned and 0 <= row < 8 and 0 <= col < 8:
+            return cls._interned[row * 8 + col]
+        return object.__new__(cls)
+
+    def __reduce__(self) -> Tuple[type, Tuple[int, int]]:
+        return (Position, (self.row, self.col))
+
     def __hash__(self) -> int:
-        return hash((self.row, self.col))
+        return self.row * 8 + self.col
 
     def is_valid(self) -> bool:
         """Check if position is within board bounds."""
@@ -55,17 +71,31 @@ class Position:
 
     def to_algebraic(self) -> str:
         """Convert to algebraic notation (e.g., 'e4')."""
+        if 0 <= self.row < 8 and 0 <= self.col < 8:
+            return ALGEBRAIC[self.row * 8 + self.col]
         return f"{chr(ord('a') + self.col)}{self.row + 1}"
 
     @staticmethod
     def from_algebraic(notation: str) -> "Position":
         """Create position from algebraic notation (e.g., 'e4')."""
+        pos = SQUARE_BY_NAME.get(notation)
+        if pos is not None:
+            return pos
         col = ord(notation[0]) - ord("a")
         row = int(notation[1]) - 1
         return Position(row, col)
 
 
-@dataclass
+# Interned squares, indexed by row * 8 + col
+Position._interned = tuple(Position(row, col) for row in range(8) for col in range(8))
+SQUARES: Tuple[Position, ...] = Position._interned
+ALGEBRAIC: List[str] = [f"{chr(ord('a') + col)}{row + 1}" for row in range(8) for col in range(8)]
+SQUARE_BY_NAME: Dict[str, Position] = dict(zip(ALGEBRAIC, SQUARES))
+# "row,col" keys used by the client-facing board map, indexed by square
+SQUARE_KEYS: Tuple[str, ...] = tuple(f"{row},{col}" for row in range(8) for col in range(8))
+
+
+@dataclass(slots=True)
 class Piece:
     """Represents a chess piece."""
 
@@ -74,36 +104,464 @@ class Piece:
     has_moved: bool = False
 
     def __str__(self) -> str:
-        symbols = {
-            (Color.WHITE, PieceType.KING): "♔",
-            (Color.WHITE, PieceType.QUEEN): "♕",
-            (Color.WHITE, PieceType.ROOK): "♖",
-            (Color.WHITE, PieceType.BISHOP): "♗",
-            (Color.WHITE, PieceType.KNIGHT): "♘",
-            (Color.WHITE, PieceType.PAWN): "♙",
-            (Color.BLACK, PieceType.KING): "♚",
-            (Color.BLACK, PieceType.QUEEN): "♛",
-            (Color.BLACK, PieceType.ROOK): "♜",
-            (Color.BLACK, PieceType.BISHOP): "♝",
-            (Color.BLACK, PieceType.KNIGHT): "♞",
-            (Color.BLACK, PieceType.PAWN): "♟",
-        }
-        return symbols.get(
-            (self.color, self.piece_type), f"{self.piece_type.value[0].upper()}"
-        )
+        symbol = PIECE_SYMBOLS.get((self.color, self.piece_type))
+        if symbol is None:
+            return f"{self.piece_type.value[0].upper()}"
+        return symbol
+
+
+# Display symbols: Unicode glyphs for the standard pieces, the first letter
+# of the type name for the fairy pieces
+PIECE_SYMBOLS: Dict[Tuple[Color, PieceType], str] = {
+    (color, piece_type): piece_type.value[0].upper()
+    for color in Color
+    for piece_type in PieceType
+}
+PIECE_SYMBOLS.update(
+    {
+        (Color.WHITE, PieceType.KING): "♔",
+        (Color.WHITE, PieceType.QUEEN): "♕",
+        (Color.WHITE, PieceType.ROOK): "♖",
+        (Color.WHITE, PieceType.BISHOP): "♗",
+        (Color.WHITE, PieceType.KNIGHT): "♘",
+        (Color.WHITE, PieceType.PAWN): "♙",
+        (Color.BLACK, PieceType.KING): "♚",
+        (Color.BLACK, PieceType.QUEEN): "♛",
+        (Color.BLACK, PieceType.ROOK): "♜",
+        (Color.BLACK, PieceType.BISHOP): "♝",
+        (Color.BLACK, PieceType.KNIGHT): "♞",
+        (Color.BLACK, PieceType.PAWN): "♟",
+    }
+)
+
+
+# Promotion piece types are packed into moves as (index + 1), so 0 means "no promotion"
+PIECE_TYPES: Tuple[PieceType, ...] = tuple(PieceType)
+PIECE_TYPE_CODES: Dict[PieceType, int] = {
+    piece_type: index + 1 for index, piece_type in enumerate(PIECE_TYPES)
+}
+
+
+class Move(int):
+    """
+    Represents a chess move, packed into a single int.
+
+    Bits 0-5 hold the from square and bits 6-11 the to square (row * 8 + col),
+    bits 12-16 the promotion piece type code, bit 17 the castling flag and
+    bit 18 the en passant flag.
+    """
+
+    __slots__ = ()
+
+    CASTLING_FLAG = 1 << 17
+    EN_PASSANT_FLAG = 1 << 18
+
+    @classmethod
+    def pack(
+        cls,
+        from_pos: Position,
+        to_pos: Position,
+        promotion_piece_type: Optional[PieceType] = None,
+        is_castling: bool = False,
+        is_en_passant: bool = False,
+    ) -> "Move":
+        """Encode a move from its squares, promotion and flags."""
+        value = (from_pos.row * 8 + from_pos.col) | ((to_pos.row * 8 + to_pos.col) << 6)
+        if promotion_piece_type is not None:
+            value |= PIECE_TYPE_CODES.get(promotion_piece_type, 0) << 12
+        if is_castling:
+            value |= cls.CASTLING_FLAG
+        if is_en_passant:
+            value |= cls.EN_PASSANT_FLAG
+        return cls(value)
+
+    @property
+    def from_pos(self) -> Position:
+        return SQUARES[self & 0x3F]
+
+    @property
+    def to_pos(self) -> Position:
+        return SQUARES[(self >> 6) & 0x3F]
+
+    @property
+    def promotion_piece_type(self) -> Optional[PieceType]:
+        code = (self >> 12) & 0x1F
+        return PIECE_TYPES[code - 1] if code else None
+
+    @property
+    def is_castling(self) -> bool:
+        return bool(self & self.CASTLING_FLAG)
+
+    @property
+    def is_en_passant(self) -> bool:
+        return bool(self & self.EN_PASSANT_FLAG)
+
+    def __repr__(self) -> str:
+        return f"Move({self.from_pos.to_algebraic()}{self.to_pos.to_algebraic()})"
+
+
+def squares_in(mask: int) -> List[Position]:
+    """Positions of the set bits of a bitboard, in square order."""
+    positions = []
+    while mask:
+        lowest = mask & -mask
+        positions.append(SQUARES[lowest.bit_length() - 1])
+        mask ^= lowest
+    return positions
+
+
+def _rank_span(row: int, start_col: int, end_col: int) -> int:
+    """Bitboard of the squares in columns [start_col, end_col) of one row."""
+    if start_col >= end_col:
+        return 0
+    return ((1 << (end_col - start_col)) - 1) << (row * 8 + start_col)
+
+
+def _leaper_attacks(offsets: List[Tuple[int, int]]) -> List[int]:
+    """Build a per-square bitboard of the squares reached by fixed (row, col) jumps."""
+    table = []
+    for square in range(64):
+        row, col = divmod(square, 8)
+        mask = 0
+        for row_offset, col_offset in offsets:
+            to_row, to_col = row + row_offset, col + col_offset
+            if 0 <= to_row < 8 and 0 <= to_col < 8:
+                mask |= 1 << (to_row * 8 + to_col)
+        table.append(mask)
+    return table
+
+
+def _ray_attacks(row_delta: int, col_delta: int) -> List[int]:
+    """Build a per-square bitboard of the full ray in one direction on an empty board."""
+    table = []
+    for square in range(64):
+        row, col = divmod(square, 8)
+        mask = 0
+        row, col = row + row_delta, col + col_delta
+        while 0 <= row < 8 and 0 <= col < 8:
+            mask |= 1 << (row * 8 + col)
+            row, col = row + row_delta, col + col_delta
+        table.append(mask)
+    return table
+
+
+KNIGHT_ATTACKS = _leaper_attacks(
+    [(2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (1, -2), (-1, 2), (-1, -2)]
+)
+KING_ATTACKS = _leaper_attacks(
+    [(1, 1), (1, 0), (1, -1), (0, 1), (0, -1), (-1, 1), (-1, 0), (-1, -1)]
+)
+GIRAFFE_ATTACKS = _leaper_attacks(
+    [(4, 1), (4, -1), (-4, 1), (-4, -1), (1, 4), (1, -4), (-1, 4), (-1, -4)]
+)
+ZEBRA_ATTACKS = _leaper_attacks(
+    [(2, 3), (2, -3), (-2, 3), (-2, -3), (3, 2), (3, -2), (-3, 2), (-3, -2)]
+)
+SHIP_ATTACKS = _leaper_attacks([(2, 2), (2, -2), (-2, 2), (-2, -2)])
+# Every square an elephant could reach on an empty board (diagonal, up to 2 squares)
+ELEPHANT_REACH = _leaper_attacks(
+    [(1, 1), (1, -1), (-1, 1), (-1, -1), (2, 2), (2, -2), (-2, 2), (-2, -2)]
+)
+# A one-square slide can never be blocked, so it is just another leap
+CHAMPION_ATTACKS = _leaper_attacks(
+    [(2, 0), (-2, 0), (0, 2), (0, -2), (2, 2), (2, -2), (-2, 2), (-2, -2),
+     (1, 0), (-1, 0), (0, 1), (0, -1)]
+)
+WIZARD_ATTACKS = _leaper_attacks(
+    [(1, 3), (1, -3), (-1, 3), (-1, -3), (3, 1), (3, -1), (-3, 1), (-3, -1),
+     (1, 1), (1, -1), (-1, 1), (-1, -1)]
+)
+
+# Squares a pawn of each color attacks from each square
+PAWN_ATTACKS: Dict[Color, List[int]] = {
+    Color.WHITE: _leaper_attacks([(1, 1), (1, -1)]),
+    Color.BLACK: _leaper_attacks([(-1, 1), (-1, -1)]),
+}
+
+# Leaper tables paired with every piece type whose movement includes that leap.
+# Leaps are symmetric, so a square is attacked by a leaper on any square that
+# the same table reaches from it.
+LEAPER_ATTACKERS: List[Tuple[List[int], Tuple[PieceType, ...]]] = [
+    (
+        KNIGHT_ATTACKS,
+        (
+            PieceType.KNIGHT,
+            PieceType.CENTAUR,
+            PieceType.CHANCELLOR,
+            PieceType.ARCHBISHOP,
+            PieceType.AMAZON,
+            PieceType.DRAGON,
+        ),
+    ),
+    (KING_ATTACKS, (PieceType.KING, PieceType.MANN, PieceType.CENTAUR)),
+    (GIRAFFE_ATTACKS, (PieceType.GIRAFFE,)),
+    (ZEBRA_ATTACKS, (PieceType.ZEBRA,)),
+    (SHIP_ATTACKS, (PieceType.SHIP,)),
+    (CHAMPION_ATTACKS, (PieceType.CHAMPION,)),
+    (WIZARD_ATTACKS, (PieceType.WIZARD,)),
+]
+ORTHOGONAL_SLIDERS = (
+    PieceType.ROOK,
+    PieceType.QUEEN,
+    PieceType.CHANCELLOR,
+    PieceType.AMAZON,
+)
+DIAGONAL_SLIDERS = (
+    PieceType.BISHOP,
+    PieceType.QUEEN,
+    PieceType.ARCHBISHOP,
+    PieceType.AMAZON,
+)
+KNIGHT_DIRECTIONS = [(2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (1, -2), (-1, 2), (-1, -2)]
+
+# Ray tables keyed by direction. Rays in a "positive" direction run toward higher
+# square indices, so their nearest blocker is the lowest set bit; the others use
+# the highest set bit.
+RAYS: Dict[Tuple[int, int], List[int]] = {
+    direction: _ray_attacks(*direction)
+    for direction in [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+}
+POSITIVE_DIRECTIONS: Set[Tuple[int, int]] = {(0, 1), (1, 0), (1, 1), (1, -1)}
+ORTHOGONAL_DIRECTIONS = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+DIAGONAL_DIRECTIONS = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+
+def slide_attacks(square: int, occupied: int, directions: List[Tuple[int, int]]) -> int:
+    """Bitboard of the squares reached by sliding from a square until blocked."""
+    attacks = 0
+    for direction in directions:
+        ray = RAYS[direction][square]
+        blockers = ray & occupied
+        if blockers:
+            # Cut the ray off behind the nearest blocker (which stays attacked)
+            if direction in POSITIVE_DIRECTIONS:
+                blocker = (blockers & -blockers).bit_length() - 1
+            else:
+                blocker = blockers.bit_length() - 1
+            ray ^= RAYS[direction][blocker]
+        attacks |= ray
+    return attacks
+
+
+def _relevant_occupancy(directions: List[Tuple[int, int]]) -> List[int]:
+    """
+    Per square, the ray squares whose occupancy can change a slide's result.
+
+    The last square of each ray is attacked whether or not it is occupied,
+    so it is left out to keep the lookup tables small.
+    """
+    table = []
+    for square in range(64):
+        mask = 0
+        for direction in directions:
+            ray = RAYS[direction][square]
+            if ray:
+                if direction in POSITIVE_DIRECTIONS:
+                    edge = ray.bit_length() - 1
+                else:
+                    edge = (ray & -ray).bit_length() - 1
+                mask |= ray & ~(1 << edge)
+        table.append(mask)
+    return table
+
+
+ROOK_OCCUPANCY = _relevant_occupancy(ORTHOGONAL_DIRECTIONS)
+BISHOP_OCCUPANCY = _relevant_occupancy(DIAGONAL_DIRECTIONS)
+
+
+def _slide_table(occupancy: List[int], directions: List[Tuple[int, int]]) -> List[Dict[int, int]]:
+    """
+    Per square, the slide result for every possible relevant blocker pattern.
+
+    Blocker subsets are enumerated with the carry-rippler trick, so a
+    lookup is a mask and a dict index (magic bitboards without the
+    multipliers). Building both tables takes ~107k slides at import time.
+    """
+    table = []
+    for square in range(64):
+        mask = occupancy[square]
+        attacks: Dict[int, int] = {}
+        subset = 0
+        while True:
+            attacks[subset] = slide_attacks(square, subset, directions)
+            subset = (subset - mask) & mask
+            if not subset:
+                break
+        table.append(attacks)
+    return table
 
 
-@dataclass
-class Move:
-    """Represents a chess move."""
+ROOK_TABLE = _slide_table(ROOK_OCCUPANCY, ORTHOGONAL_DIRECTIONS)
+BISHOP_TABLE = _slide_table(BISHOP_OCCUPANCY, DIAGONAL_DIRECTIONS)
 
-    from_pos: Position
-    to_pos: Position
-    piece: Piece
-    captured_piece: Optional[Piece] = None
-    is_castling: bool = False
-    is_en_passant: bool = False
-    promotion_piece_type: Optional[PieceType] = None
+
+def rook_attacks(square: int, occupied: int) -> int:
+    """Orthogonal sliding attacks from a square, given the board occupancy."""
+    return ROOK_TABLE[square][occupied & ROOK_OCCUPANCY[square]]
+
+
+def bishop_attacks(square: int, occupied: int) -> int:
+    """Diagonal sliding attacks from a square, given the board occupancy."""
+    return BISHOP_TABLE[square][occupied & BISHOP_OCCUPANCY[square]]
+
+
+# Zobrist keys for hashing board contents: one random 64-bit key per
+# (color, piece type, square), so a position hash is the XOR of its pieces' keys
+_zobrist_random = random.Random(0x5EED)
+ZOBRIST_KEYS: Dict[Tuple[Color, PieceType], List[int]] = {
+    (color, piece_type): [_zobrist_random.getrandbits(64) for _ in range(64)]
+    for color in Color
+    for piece_type in PieceType
+}
+
+
+def _zobrist_key(piece: "Piece", square: int) -> int:
+    keys = ZOBRIST_KEYS.get((piece.color, piece.piece_type))
+    if keys is None:
+        # Piece types outside the enum still get a stable key
+        keys = [_zobrist_random.getrandbits(64) for _ in range(64)]
+        ZOBRIST_KEYS[(piece.color, piece.piece_type)] = keys
+    return keys[square]
+
+
+class Board:
+    """
+    Board storage: a 64-entry mailbox plus occupancy bitboards.
+
+    Squares are indexed as row * 8 + col. The class keeps the mapping
+    interface of the Dict[Position, Piece] it replaced (indexing, get, pop,
+    clear, items, ...), and every mutation keeps the mailbox, the
+    bitboards and the Zobrist hash of the contents in sync.
+    """
+
+    def __init__(self) -> None:
+        self.mailbox: List[Optional[Piece]] = [None] * 64
+        self.occupancy: Dict[Color, int] = {Color.WHITE: 0, Color.BLACK: 0}
+        self.piece_bitboards: Dict[Tuple[Color, PieceType], int] = {}
+        self.zobrist_hash = 0
+
+    @staticmethod
+    def _index(pos: Position) -> Optional[int]:
+        if 0 <= pos.row < 8 and 0 <= pos.col < 8:
+            return pos.row * 8 + pos.col
+        return None
+
+    def place(self, square: int, piece: Optional[Piece]) -> None:
+        """Put a piece on (or clear) a square by index, updating the bitboards."""
+        bit = 1 << square
+        old_piece = self.mailbox[square]
+        if old_piece is not None:
+            self.occupancy[old_piece.color] &= ~bit
+            key = (old_piece.color, old_piece.piece_type)
+            self.piece_bitboards[key] = self.piece_bitboards.get(key, 0) & ~bit
+            self.zobrist_hash ^= _zobrist_key(old_piece, square)
+        self.mailbox[square] = piece
+        if piece is not None:
+            self.occupancy[piece.color] |= bit
+            key = (piece.color, piece.piece_type)
+            self.piece_bitboards[key] = self.piece_bitboards.get(key, 0) | bit
+            self.zobrist_hash ^= _zobrist_key(piece, square)
+
+    def pieces(self, color: Color, piece_types: Tuple[PieceType, ...]) -> int:
+        """Bitboard of the given color's pieces of any of the given types."""
+        mask = 0
+        for piece_type in piece_types:
+            mask |= self.piece_bitboards.get((color, piece_type), 0)
+        return mask
+
+    def copy(self) -> "Board":
+        """Return a copy sharing the Piece objects but not the storage."""
+        board = Board.__new__(Board)
+        board.mailbox = self.mailbox.copy()
+        board.occupancy = self.occupancy.copy()
+        board.piece_bitboards = self.piece_bitboards.copy()
+        board.zobrist_hash = self.zobrist_hash
+        return board
+
+    def get(self, pos: Position, default: Optional[Piece] = None) -> Optional[Piece]:
+        index = self._index(pos)
+        if index is None:
+            return default
+        piece = self.mailbox[index]
+        return default if piece is None else piece
+
+    def __getitem__(self, pos: Position) -> Piece:
+        piece = self.get(pos)
+        if piece is None:
+            raise KeyError(pos)
+        return piece
+
+    def __setitem__(self, pos: Position, piece: Piece) -> None:
+        index = self._index(pos)
+        if index is None:
+            raise KeyError(pos)
+        self.place(index, piece)
+
+    def __delitem__(self, pos: Position) -> None:
+        self.pop(pos)
+
+    def __contains__(self, pos: object) -> bool:
+        return isinstance(pos, Position) and self.get(pos) is not None
+
+    def __len__(self) -> int:
+        return (self.occupancy[Color.WHITE] | self.occupancy[Color.BLACK]).bit_count()
+
+    def __iter__(self) -> Iterator[Position]:
+        return iter(self.keys())
+
+    def pop(self, pos: Position, *default: Optional[Piece]) -> Optional[Piece]:
+        piece = self.get(pos)
+        if piece is None:
+            if default:
+                return default[0]
+            raise KeyError(pos)
+        self.place(pos.row * 8 + pos.col, None)
+        return piece
+
+    def clear(self) -> None:
+        self.mailbox = [None] * 64
+        self.occupancy = {Color.WHITE: 0, Color.BLACK: 0}
+        self.piece_bitboards = {}
+        self.zobrist_hash = 0
+
+    def keys(self) -> List[Position]:
+        return [SQUARES[i] for i, piece in enumerate(self.mailbox) if piece is not None]
+
+    def values(self) -> List[Piece]:
+        return [piece for piece in self.mailbox if piece is not None]
+
+    def items(self) -> List[Tuple[Position, Piece]]:
+        """Snapshot of (position, piece) pairs in square order."""
+        return [
+            (SQUARES[i], piece) for i, piece in enumerate(self.mailbox) if piece is not None
+        ]
+
+
+# Positions kept in ChessGame's legal move cache before it is flushed
+MOVE_CACHE_SIZE = 256
+
+# Both pawn ranks of the starting position, cloned by every new game
+PAWN_RANKS = Board()
+for _col in range(8):
+    PAWN_RANKS[Position(1, _col)] = Piece(PieceType.PAWN, Color.WHITE)
+    PAWN_RANKS[Position(6, _col)] = Piece(PieceType.PAWN, Color.BLACK)
+
+# All available fairy piece types
+FAIRY_PIECE_TYPES = [
+    PieceType.MANN, PieceType.ELEPHANT, PieceType.GIRAFFE,
+    PieceType.UNICORN, PieceType.ZEBRA, PieceType.CENTAUR,
+    PieceType.CHAMPION, PieceType.WIZARD, PieceType.CHANCELLOR,
+    PieceType.ARCHBISHOP, PieceType.AMAZON, PieceType.DRAGON,
+    PieceType.SHIP,
+]
+
+# Standard piece weights and maximum counts for the random back rank
+STANDARD_PIECE_CONFIG = {
+    PieceType.ROOK: {"weight": 120, "max_count": 2},
+    PieceType.BISHOP: {"weight": 120, "max_count": 2},
+    PieceType.KNIGHT: {"weight": 120, "max_count": 2},
+    PieceType.QUEEN: {"weight": 60, "max_count": 1},
+}
 
 
 class ChessGame:
@@ -114,8 +572,8 @@ class ChessGame:
     in separate methods, making it easy to modify piece behavior in the future.
     """
 
-    def __init__(self) -> None:
-        self.board: Dict[Position, Piece] = {}
+    def __init__(self, setup_board: bool = True) -> None:
+        self.board: Board = Board()
         self.current_turn: Color = Color.WHITE
         self.move_history: List[Move] = []
         self.en_passant_target: Optional[Position] = None
@@ -129,14 +587,40 @@ class ChessGame:
         self.position_history: Dict[
             str, int
         ] = {}  # Track position occurrences for threefold repetition
-        self._initialize_board()
+        # Legal moves per square, memoized per position (see _move_cache_key)
+        self._legal_move_cache: Dict[
+            Tuple[int, Color, Optional[Position], int], Dict[Position, List[Position]]
+        ] = {}
+        # Every legal move of the side to move, rebuilt when the cache key changes
+        self._all_moves_key: Optional[Tuple[int, Color, Optional[Position], int]] = None
+        self._all_moves: Dict[Position, List[Position]] = {}
+        # Serialized board for broadcasts, rebuilt when the board hash changes
+        self._board_cache_key: Optional[int] = None
+        self._board_dict_cache: Optional[Dict[str, Dict[str, str]]] = None
+        self._board_json_cache: Optional[str] = None
+        if setup_board:
+            self._initialize_board()
+
+    @classmethod
+    def empty(cls) -> "ChessGame":
+        """Create a game with an empty board and white to move, for custom positions."""
+        return cls(setup_board=False)
+
+    def place(self, notation: str, piece_type: PieceType, color: Color) -> Piece:
+        """Put a new piece on the square given in algebraic notation and return it."""
+        piece = Piece(piece_type, color)
+        self.board[Position.from_algebraic(notation)] = piece
+        return piece
 
     def _initialize_board(self) -> None:
         """Set up the initial chess board position with random layout."""
-        # Set up pawns
+        # Set up pawns: the pawn ranks never change, so their bitboards and
+        # hash are cloned from a template, but every square gets its own Piece
+        self.board = PAWN_RANKS.copy()
+        mailbox = self.board.mailbox
         for col in range(8):
-            self.board[Position(1, col)] = Piece(PieceType.PAWN, Color.WHITE)
-            self.board[Position(6, col)] = Piece(PieceType.PAWN, Color.BLACK)
+            mailbox[8 + col] = Piece(PieceType.PAWN, Color.WHITE)
+            mailbox[48 + col] = Piece(PieceType.PAWN, Color.BLACK)
 
         # Set up back ranks with random layout (mirrored for both colors)
         back_rank_order = self.generate_random_board_layout()
@@ -160,29 +644,12 @@ class ChessGame:
         Returns:
             A list of 8 PieceTypes representing the back row layout
         """
-        # All available fairy piece types
-        all_fairy_pieces = [
-            PieceType.MANN, PieceType.ELEPHANT, PieceType.GIRAFFE,
-            PieceType.UNICORN, PieceType.ZEBRA, PieceType.CENTAUR,
-            PieceType.CHAMPION, PieceType.WIZARD, PieceType.CHANCELLOR,
-            PieceType.ARCHBISHOP, PieceType.AMAZON, PieceType.DRAGON,
-            PieceType.SHIP,
-        ]
-
-        # Standard piece weights and maximum counts
-        standard_piece_config = {
-            PieceType.ROOK: {"weight": 120, "max_count": 2},
-            PieceType.BISHOP: {"weight": 120, "max_count": 2},
-            PieceType.KNIGHT: {"weight": 120, "max_count": 2},
-            PieceType.QUEEN: {"weight": 60, "max_count": 1},
-        }
-
         # Determine how many fairy pieces to include:
         # weights [1, 4, 1] give ~17% / ~66% / ~17% for counts 1 / 2 / 3
         fairy_count = random.choices([1, 2, 3], weights=[1, 4, 1], k=1)[0]
 
         # Select distinct fairy pieces without replacement
-        selected_fairy_pieces = random.sample(all_fairy_pieces, fairy_count)
+        selected_fairy_pieces = random.sample(FAIRY_PIECE_TYPES, fairy_count)
 
         # Fill remaining slots with standard pieces using weighted selection
         standard_pieces = []
@@ -193,7 +660,7 @@ class ChessGame:
             available_pieces = []
             weights = []
 
-            for piece_type, config in standard_piece_config.items():
+            for piece_type, config in STANDARD_PIECE_CONFIG.items():
                 if standard_counts.get(piece_type, 0) < config["max_count"]:
                     available_pieces.append(piece_type)
                     weights.append(config["weight"])
@@ -226,15 +693,13 @@ class ChessGame:
         position_parts = []
 
         # Add all pieces in a sorted order (by position)
-        for row in range(8):
-            for col in range(8):
-                pos = Position(row, col)
-                piece = self.get_piece(pos)
-                if piece:
-                    # Include piece type, color, and whether it has moved (for castling rights)
-                    position_parts.append(
-                        f"{row},{col}:{piece.color.value}:{piece.piece_type.value}:{piece.has_moved}"
-                    )
+        for square, piece in enumerate(self.board.mailbox):
+            if piece:
+                row, col = divmod(square, 8)
+                # Include piece type, color, and whether it has moved (for castling rights)
+                position_parts.append(
+                    f"{row},{col}:{piece.color.value}:{piece.piece_type.value}:{piece.has_moved}"
+                )
 
         # Add current turn
         position_parts.append(f"turn:{self.current_turn.value}")
@@ -249,7 +714,17 @@ class ChessGame:
 
     def get_piece(self, pos: Position) -> Optional[Piece]:
         """Get the piece at a given position."""
-        return self.board.get(pos)
+        if 0 <= pos.row < 8 and 0 <= pos.col < 8:
+            return self.board.mailbox[pos.row * 8 + pos.col]
+        return None
+
+    def _moves_from_mask(self, mask: int, piece: Piece) -> List[Position]:
+        """Convert an attack bitboard into target positions, skipping friendly pieces."""
+        return squares_in(mask & ~self.board.occupancy[piece.color])
+
+    def _occupied(self) -> int:
+        """Bitboard of every occupied square."""
+        return self.board.occupancy[Color.WHITE] | self.board.occupancy[Color.BLACK]
 
     def get_possible_moves(self, from_pos: Position) -> List[Position]:
         """
@@ -258,347 +733,386 @@ class ChessGame:
         This method delegates to piece-specific movement methods,
         making it easy to modify individual piece behaviors later.
         """
+        return list(self._legal_moves(from_pos, self._position_move_cache()))
+
+    def all_possible_moves(self) -> Dict[Position, List[Position]]:
+        """
+        Legal moves of every piece of the side to move that has any.
+
+        The result is memoized per position and shared between callers, so
+        it must not be modified.
+        """
+        cache_key = self._move_cache_key()
+        if cache_key != self._all_moves_key:
+            position_moves = self._position_move_cache()
+            all_moves = {}
+            for pos in squares_in(self.board.occupancy[self.current_turn]):
+                moves = self._legal_moves(pos, position_moves)
+                if moves:
+                    all_moves[pos] = moves
+            self._all_moves = all_moves
+            self._all_moves_key = cache_key
+        return self._all_moves
+
+    def legal_moves_packed(self) -> List[int]:
+        """
+        All legal moves of the side to move as plain ints in Move's layout
+        (from square in bits 0-5, to square in bits 6-11), for compact payloads.
+        """
+        return [
+            int(Move.pack(from_pos, to_pos))
+            for from_pos, moves in self.all_possible_moves().items()
+            for to_pos in moves
+        ]
+
+    def can_move(self, from_pos: Position, to_pos: Position) -> bool:
+        """Check if moving the piece at from_pos to to_pos is legal."""
+        return to_pos in self._legal_moves(from_pos, self._position_move_cache())
+
+    def has_legal_moves(self) -> bool:
+        """
+        Check if the player to move has at least one legal move.
+
+        The king is tried first: king steps are the usual way out of check
+        and are checked without simulating the move.
+        """
+        position_moves = self._position_move_cache()
+        own = self.board.occupancy[self.current_turn]
+        kings = self.board.pieces(self.current_turn, (PieceType.KING,)) & own
+        for pos in squares_in(kings) + squares_in(own & ~kings):
+            if self._legal_moves(pos, position_moves):
+                return True
+        return False
+
+    def _position_move_cache(self) -> Dict[Position, List[Position]]:
+        """The legal move cache entry for the current position, created on first use."""
+        cache_key = self._move_cache_key()
+        position_moves = self._legal_move_cache.get(cache_key)
+        if position_moves is None:
+            if len(self._legal_move_cache) >= MOVE_CACHE_SIZE:
+                self._legal_move_cache.clear()
+            position_moves = self._legal_move_cache[cache_key] = {}
+        return position_moves
+
+    def _legal_moves(
+        self, from_pos: Position, position_moves: Dict[Position, List[Position]]
+    ) -> List[Position]:
+        """
+        Legal moves for the piece at from_pos, memoized in position_moves.
+
+        The returned list is shared with the cache and must not be mutated.
+        """
         piece = self.get_piece(from_pos)
         if not piece or piece.color != self.current_turn:
             return []
 
+        cached_moves = position_moves.get(from_pos)
+        if cached_moves is not None:
+            return cached_moves
+
         # Get pseudo-legal moves (moves that don't consider check)
-        if piece.piece_type == PieceType.PAWN:
-            possible_moves = self._get_pawn_moves(from_pos, piece)
-        elif piece.piece_type == PieceType.ROOK:
-            possible_moves = self._get_rook_moves(from_pos, piece)
-        elif piece.piece_type == PieceType.KNIGHT:
-            possible_moves = self._get_knight_moves(from_pos, piece)
-        elif piece.piece_type == PieceType.BISHOP:
-            possible_moves = self._get_bishop_moves(from_pos, piece)
-        elif piece.piece_type == PieceType.QUEEN:
-            possible_moves = self._get_queen_moves(from_pos, piece)
-        elif piece.piece_type == PieceType.KING:
-            possible_moves = self._get_king_moves(from_pos, piece)
-        elif piece.piece_type == PieceType.MANN:
-            possible_moves = self._get_mann_moves(from_pos, piece)
-        elif piece.piece_type == PieceType.ELEPHANT:
-            possible_moves = self._get_elephant_moves(from_pos, piece)
-        elif piece.piece_type == PieceType.GIRAFFE:
-            possible_moves = self._get_giraffe_moves(from_pos, piece)
-        elif piece.piece_type == PieceType.UNICORN:
-            possible_moves = self._get_unicorn_moves(from_pos, piece)
-        elif piece.piece_type == PieceType.ZEBRA:
-            possible_moves = self._get_zebra_moves(from_pos, piece)
-        elif piece.piece_type == PieceType.CENTAUR:
-            possible_moves = self._get_centaur_moves(from_pos, piece)
-        elif piece.piece_type == PieceType.CHAMPION:
-            possible_moves = self._get_champion_moves(from_pos, piece)
-        elif piece.piece_type == PieceType.WIZARD:
-            possible_moves = self._get_wizard_moves(from_pos, piece)
-        elif piece.piece_type == PieceType.CHANCELLOR:
-            possible_moves = self._get_chancellor_moves(from_pos, piece)
-        elif piece.piece_type == PieceType.ARCHBISHOP:
-            possible_moves = self._get_archbishop_moves(from_pos, piece)
-        elif piece.piece_type == PieceType.AMAZON:
-            possible_moves = self._get_amazon_moves(from_pos, piece)
-        elif piece.piece_type == PieceType.DRAGON:
-            possible_moves = self._get_dragon_moves(from_pos, piece)
-        elif piece.piece_type == PieceType.SHIP:
-            possible_moves = self._get_ship_moves(from_pos, piece)
-        else:
-            possible_moves = []
+        generator = MOVE_GENERATORS.get(piece.piece_type)
+        possible_moves = generator(self, from_pos, piece) if generator else []
 
         # Filter out moves that would leave the king in check
+        if piece.piece_type == PieceType.KING:
+            legal_moves = self._filter_king_moves(from_pos, piece, possible_moves)
+        else:
+            legal_moves = self._filter_piece_moves(from_pos, piece, possible_moves)
+
+        position_moves[from_pos] = legal_moves
+        return legal_moves
+
+    def _filter_piece_moves(
+        self, from_pos: Position, piece: Piece, moves: List[Position]
+    ) -> List[Position]:
+        """
+        Keep the non-king moves that don't leave the own king in check.
+
+        Such a move can only expose the king by stepping off a pin line or
+        by failing to answer a check, so both are tested with masks from
+        _check_and_pin_masks. En passant removes a second piece from the
+        board and is still simulated, as is every move when the side
+        doesn't have exactly one king.
+        """
+        masks = self._check_and_pin_masks(piece.color)
+        if masks is None:
+            return [to_pos for to_pos in moves if self._is_legal_move(from_pos, to_pos)]
+
+        evasion_mask, pins = masks
+        allowed = evasion_mask & pins.get(from_pos.row * 8 + from_pos.col, -1)
         legal_moves = []
-        for to_pos in possible_moves:
-            if self._is_legal_move(from_pos, to_pos):
+        for to_pos in moves:
+            if piece.piece_type == PieceType.PAWN and to_pos == self.en_passant_target:
+                if self._is_legal_move(from_pos, to_pos):
+                    legal_moves.append(to_pos)
+            elif allowed & (1 << (to_pos.row * 8 + to_pos.col)):
                 legal_moves.append(to_pos)
+        return legal_moves
 
+    def _check_and_pin_masks(self, color: Color) -> Optional[Tuple[int, Dict[int, int]]]:
+        """
+        Checkers and pins against the given side's king, from one scan.
+
+        Returns (evasion_mask, pins). A non-king move must land on
+        evasion_mask: every square when not in check, the checker or a
+        blocking square for a single check, nothing for a double check.
+        pins maps each pinned piece's square to the line it may move along
+        (up to and including the pinner). Returns None without exactly one
+        king. Only slider, elephant and unicorn lines can be blocked, so
+        they are the only sources of pins.
+        """
+        board = self.board
+        kings = board.piece_bitboards.get((color, PieceType.KING), 0)
+        if kings.bit_count() != 1:
+            return None
+
+        king_square = kings.bit_length() - 1
+        king_row, king_col = divmod(king_square, 8)
+        opponent = color.opposite()
+        own = board.occupancy[color]
+        occupied = own | board.occupancy[opponent]
+        pins: Dict[int, int] = {}
+        checks: List[int] = []
+
+        for table, piece_types in LEAPER_ATTACKERS:
+            checkers = table[king_square] & board.pieces(opponent, piece_types)
+            while checkers:
+                checker = checkers & -checkers
+                checks.append(checker)
+                checkers ^= checker
+        checkers = PAWN_ATTACKS[color][king_square] & board.pieces(
+            opponent, (PieceType.PAWN, PieceType.DRAGON)
+        )
+        while checkers:
+            checker = checkers & -checkers
+            checks.append(checker)
+            checkers ^= checker
+
+        orthogonal = board.pieces(opponent, ORTHOGONAL_SLIDERS)
+        diagonal = board.pieces(opponent, DIAGONAL_SLIDERS)
+        elephants = board.pieces(opponent, (PieceType.ELEPHANT,))
+        for direction, rays in RAYS.items():
+            if direction[0] and direction[1]:
+                sliders, short_sliders = diagonal, elephants
+            else:
+                sliders, short_sliders = orthogonal, 0
+            if not sliders and not short_sliders:
+                continue
+            positive = direction in POSITIVE_DIRECTIONS
+
+            # Walk to the first and, if that one is ours, the second piece on the ray
+            blockers = rays[king_square] & occupied
+            first = -1
+            for _ in range(2):
+                if not blockers:
+                    break
+                nearest = blockers & -blockers if positive else 1 << (blockers.bit_length() - 1)
+                square = nearest.bit_length() - 1
+                line = rays[king_square] ^ rays[square]
+                attacks = sliders & nearest or (
+                    short_sliders & nearest and abs(square // 8 - king_row) <= 2
+                )
+                if first < 0:
+                    if not own & nearest:
+                        if attacks:
+                            checks.append(line)
+                        break
+                    first = square
+                elif attacks:
+                    pins[first] = line
+                    break
+                else:
+                    break
+                blockers = rays[square] & occupied
+
+        unicorns = board.pieces(opponent, (PieceType.UNICORN,))
+        if unicorns:
+            for row_delta, col_delta in KNIGHT_DIRECTIONS:
+                line = 0
+                first = -1
+                row, col = king_row + row_delta, king_col + col_delta
+                while 0 <= row < 8 and 0 <= col < 8:
+                    bit = 1 << (row * 8 + col)
+                    line |= bit
+                    if occupied & bit:
+                        if first < 0 and own & bit:
+                            first = row * 8 + col
+                        else:
+                            if unicorns & bit:
+                                if first < 0:
+                                    checks.append(line)
+                                else:
+                                    pins[first] = line
+                            break
+                    row, col = row + row_delta, col + col_delta
+
+        if not checks:
+            evasion_mask = -1
+        elif len(checks) == 1:
+            evasion_mask = checks[0]
+        else:
+            evasion_mask = 0
+        return evasion_mask, pins
+
+    def _filter_king_moves(
+        self, from_pos: Position, piece: Piece, moves: List[Position]
+    ) -> List[Position]:
+        """
+        Keep the king moves that don't end on an attacked square.
+
+        A king step only changes the king's own square, so instead of
+        simulating it the destination is tested against the occupancy with
+        the king lifted off its origin (sliders see through it). Castling
+        also moves a rook and still goes through full simulation, as does
+        any position without exactly this one king.
+        """
+        from_square = from_pos.row * 8 + from_pos.col
+        kings = self.board.piece_bitboards.get((piece.color, PieceType.KING), 0)
+        if kings != 1 << from_square:
+            return [to_pos for to_pos in moves if self._is_legal_move(from_pos, to_pos)]
+
+        occupied = (
+            self.board.occupancy[Color.WHITE] | self.board.occupancy[Color.BLACK]
+        ) & ~(1 << from_square)
+        opponent = piece.color.opposite()
+        legal_moves = []
+        for to_pos in moves:
+            if abs(to_pos.col - from_pos.col) == 2:
+                if self._is_legal_move(from_pos, to_pos):
+                    legal_moves.append(to_pos)
+                continue
+            to_square = to_pos.row * 8 + to_pos.col
+            if not self._square_attacked_by(
+                to_square, opponent, occupied | (1 << to_square)
+            ):
+                legal_moves.append(to_pos)
         return legal_moves
 
+    def _move_cache_key(self) -> Tuple[int, Color, Optional[Position], int]:
+        """
+        Key identifying everything legal move generation depends on.
+
+        Board contents come from the incrementally maintained Zobrist hash.
+        has_moved flags (castling rights, pawn double steps) are mutable on
+        the pieces themselves, so they are folded in as a bitmask of unmoved
+        pieces rather than tracked by the board.
+        """
+        unmoved = 0
+        for square, piece in enumerate(self.board.mailbox):
+            if piece is not None and not piece.has_moved:
+                unmoved |= 1 << square
+        return (
+            self.board.zobrist_hash,
+            self.current_turn,
+            self.en_passant_target,
+            unmoved,
+        )
+
     def _get_pawn_moves(self, from_pos: Position, piece: Piece) -> List[Position]:
         """Get possible moves for a pawn."""
         moves = []
         direction = 1 if piece.color == Color.WHITE else -1
+        square = from_pos.row * 8 + from_pos.col
+        occupied = self._occupied()
 
         # Forward move
-        forward_pos = from_pos.offset(direction, 0)
-        if forward_pos.is_valid() and not self.get_piece(forward_pos):
-            moves.append(forward_pos)
+        if 0 <= from_pos.row + direction < 8:
+            forward = square + 8 * direction
+            if not occupied & (1 << forward):
+                moves.append(SQUARES[forward])
 
-            # Double move from starting position
-            if not piece.has_moved:
-                double_forward = from_pos.offset(2 * direction, 0)
-                if double_forward.is_valid() and not self.get_piece(double_forward):
-                    moves.append(double_forward)
+                # Double move from starting position
+                if not piece.has_moved and 0 <= from_pos.row + 2 * direction < 8:
+                    double_forward = forward + 8 * direction
+                    if not occupied & (1 << double_forward):
+                        moves.append(SQUARES[double_forward])
 
         # Captures
-        for col_offset in [-1, 1]:
-            capture_pos = from_pos.offset(direction, col_offset)
-            if capture_pos.is_valid():
-                target_piece = self.get_piece(capture_pos)
-                if target_piece and target_piece.color != piece.color:
-                    moves.append(capture_pos)
+        attacks = PAWN_ATTACKS[piece.color][square]
+        moves.extend(squares_in(attacks & self.board.occupancy[piece.color.opposite()]))
 
-                # En passant
-                if capture_pos == self.en_passant_target:
-                    moves.append(capture_pos)
+        # En passant
+        target = self.en_passant_target
+        if target is not None and attacks & (1 << (target.row * 8 + target.col)):
+            moves.append(target)
 
         return moves
 
     def _get_rook_moves(self, from_pos: Position, piece: Piece) -> List[Position]:
         """Get possible moves for a rook."""
-        return self._get_sliding_moves(
-            from_pos, piece, [(0, 1), (0, -1), (1, 0), (-1, 0)]
-        )
+        square = from_pos.row * 8 + from_pos.col
+        return self._moves_from_mask(rook_attacks(square, self._occupied()), piece)
 
     def _get_bishop_moves(self, from_pos: Position, piece: Piece) -> List[Position]:
         """Get possible moves for a bishop."""
-        return self._get_sliding_moves(
-            from_pos, piece, [(1, 1), (1, -1), (-1, 1), (-1, -1)]
-        )
+        square = from_pos.row * 8 + from_pos.col
+        return self._moves_from_mask(bishop_attacks(square, self._occupied()), piece)
 
     def _get_elephant_moves(self, from_pos: Position, piece: Piece) -> List[Position]:
         """Get possible moves for an elephant (diagonal, max 2 squares)."""
-        moves = []
-        directions = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
-
-        for row_delta, col_delta in directions:
-            for distance in range(1, 3):  # Max 2 squares
-                current_pos = from_pos.offset(
-                    row_delta * distance, col_delta * distance
-                )
-                if not current_pos.is_valid():
-                    break
-
-                target_piece = self.get_piece(current_pos)
-                if not target_piece:
-                    moves.append(current_pos)
-                elif target_piece.color != piece.color:
-                    moves.append(current_pos)
-                    break
-                else:
-                    break
-
-        return moves
+        square = from_pos.row * 8 + from_pos.col
+        attacks = bishop_attacks(square, self._occupied())
+        return self._moves_from_mask(attacks & ELEPHANT_REACH[square], piece)
 
     def _get_queen_moves(self, from_pos: Position, piece: Piece) -> List[Position]:
         """Get possible moves for a queen."""
-        directions = [
-            (0, 1),
-            (0, -1),
-            (1, 0),
-            (-1, 0),
-            (1, 1),
-            (1, -1),
-            (-1, 1),
-            (-1, -1),
-        ]
-        return self._get_sliding_moves(from_pos, piece, directions)
+        square = from_pos.row * 8 + from_pos.col
+        occupied = self._occupied()
+        return self._moves_from_mask(
+            rook_attacks(square, occupied) | bishop_attacks(square, occupied), piece
+        )
 
     def _get_knight_moves(self, from_pos: Position, piece: Piece) -> List[Position]:
         """Get possible moves for a knight."""
-        moves = []
-        knight_offsets = [
-            (2, 1),
-            (2, -1),
-            (-2, 1),
-            (-2, -1),
-            (1, 2),
-            (1, -2),
-            (-1, 2),
-            (-1, -2),
-        ]
-
-        for row_offset, col_offset in knight_offsets:
-            to_pos = from_pos.offset(row_offset, col_offset)
-            if to_pos.is_valid():
-                target_piece = self.get_piece(to_pos)
-                if not target_piece or target_piece.color != piece.color:
-                    moves.append(to_pos)
-
-        return moves
+        return self._moves_from_mask(
+            KNIGHT_ATTACKS[from_pos.row * 8 + from_pos.col], piece
+        )
 
     def _get_giraffe_moves(self, from_pos: Position, piece: Piece) -> List[Position]:
         """Get possible moves for a giraffe (4 squares in one direction, 1 in perpendicular)."""
-        moves = []
-        giraffe_offsets = [
-            (4, 1),
-            (4, -1),
-            (-4, 1),
-            (-4, -1),
-            (1, 4),
-            (1, -4),
-            (-1, 4),
-            (-1, -4),
-        ]
-
-        for row_offset, col_offset in giraffe_offsets:
-            to_pos = from_pos.offset(row_offset, col_offset)
-            if to_pos.is_valid():
-                target_piece = self.get_piece(to_pos)
-                if not target_piece or target_piece.color != piece.color:
-                    moves.append(to_pos)
-
-        return moves
+        return self._moves_from_mask(
+            GIRAFFE_ATTACKS[from_pos.row * 8 + from_pos.col], piece
+        )
 
     def _get_unicorn_moves(self, from_pos: Position, piece: Piece) -> List[Position]:
         """Get possible moves for a unicorn (nightrider - sliding knight moves)."""
-        moves = []
-        knight_offsets = [
-            (2, 1),
-            (2, -1),
-            (-2, 1),
-            (-2, -1),
-            (1, 2),
-            (1, -2),
-            (-1, 2),
-            (-1, -2),
-        ]
-
-        for row_delta, col_delta in knight_offsets:
-            current_pos = from_pos
-            while True:
-                current_pos = current_pos.offset(row_delta, col_delta)
-                if not current_pos.is_valid():
+        occupied = self._occupied()
+        attacks = 0
+
+        for row_delta, col_delta in KNIGHT_DIRECTIONS:
+            row, col = from_pos.row + row_delta, from_pos.col + col_delta
+            while 0 <= row < 8 and 0 <= col < 8:
+                bit = 1 << (row * 8 + col)
+                attacks |= bit
+                if occupied & bit:
                     break
+                row, col = row + row_delta, col + col_delta
 
-                target_piece = self.get_piece(current_pos)
-                if not target_piece:
-                    moves.append(current_pos)
-                elif target_piece.color != piece.color:
-                    moves.append(current_pos)
-                    break
-                else:
-                    break
-
-        return moves
+        return self._moves_from_mask(attacks, piece)
 
     def _get_zebra_moves(self, from_pos: Position, piece: Piece) -> List[Position]:
         """Get possible moves for a zebra ((2,3)-leaper)."""
-        moves = []
-        zebra_offsets = [
-            (2, 3),
-            (2, -3),
-            (-2, 3),
-            (-2, -3),
-            (3, 2),
-            (3, -2),
-            (-3, 2),
-            (-3, -2),
-        ]
-
-        for row_offset, col_offset in zebra_offsets:
-            to_pos = from_pos.offset(row_offset, col_offset)
-            if to_pos.is_valid():
-                target_piece = self.get_piece(to_pos)
-                if not target_piece or target_piece.color != piece.color:
-                    moves.append(to_pos)
-
-        return moves
+        return self._moves_from_mask(
+            ZEBRA_ATTACKS[from_pos.row * 8 + from_pos.col], piece
+        )
 
     def _get_centaur_moves(self, from_pos: Position, piece: Piece) -> List[Position]:
         """Get possible moves for a centaur (combines knight and king movements)."""
-        moves = []
-
-        # Knight moves (L-shaped jumps)
-        knight_offsets = [
-            (2, 1),
-            (2, -1),
-            (-2, 1),
-            (-2, -1),
-            (1, 2),
-            (1, -2),
-            (-1, 2),
-            (-1, -2),
-        ]
-
-        for row_offset, col_offset in knight_offsets:
-            to_pos = from_pos.offset(row_offset, col_offset)
-            if to_pos.is_valid():
-                target_piece = self.get_piece(to_pos)
-                if not target_piece or target_piece.color != piece.color:
-                    moves.append(to_pos)
-
-        # King moves (one square in any direction)
-        for row_offset in [-1, 0, 1]:
-            for col_offset in [-1, 0, 1]:
-                if row_offset == 0 and col_offset == 0:
-                    continue
-                to_pos = from_pos.offset(row_offset, col_offset)
-                if to_pos.is_valid():
-                    target_piece = self.get_piece(to_pos)
-                    if not target_piece or target_piece.color != piece.color:
-                        moves.append(to_pos)
-
-        return moves
+        square = from_pos.row * 8 + from_pos.col
+        return self._moves_from_mask(KNIGHT_ATTACKS[square] | KING_ATTACKS[square], piece)
 
     def _get_champion_moves(self, from_pos: Position, piece: Piece) -> List[Position]:
         """Get possible moves for a champion (leaper that jumps 2 squares orthogonally/diagonally or slides 1 square orthogonally)."""
-        moves = []
-
-        # Jump two squares orthogonally
-        orthogonal_jumps = [(2, 0), (-2, 0), (0, 2), (0, -2)]
-
-        for row_offset, col_offset in orthogonal_jumps:
-            to_pos = from_pos.offset(row_offset, col_offset)
-            if to_pos.is_valid():
-                target_piece = self.get_piece(to_pos)
-                if not target_piece or target_piece.color != piece.color:
-                    moves.append(to_pos)
-
-        # Jump two squares diagonally
-        diagonal_jumps = [(2, 2), (2, -2), (-2, 2), (-2, -2)]
-
-        for row_offset, col_offset in diagonal_jumps:
-            to_pos = from_pos.offset(row_offset, col_offset)
-            if to_pos.is_valid():
-                target_piece = self.get_piece(to_pos)
-                if not target_piece or target_piece.color != piece.color:
-                    moves.append(to_pos)
-
-        # Slide one square orthogonally (non-jumping)
-        orthogonal_slides = [(1, 0), (-1, 0), (0, 1), (0, -1)]
-
-        for row_offset, col_offset in orthogonal_slides:
-            to_pos = from_pos.offset(row_offset, col_offset)
-            if to_pos.is_valid():
-                target_piece = self.get_piece(to_pos)
-                if not target_piece or target_piece.color != piece.color:
-                    moves.append(to_pos)
-
-        return moves
+        return self._moves_from_mask(
+            CHAMPION_ATTACKS[from_pos.row * 8 + from_pos.col], piece
+        )
 
     def _get_wizard_moves(self, from_pos: Position, piece: Piece) -> List[Position]:
         """Get possible moves for a wizard (leaper that jumps (1,3) or (3,1) or slides 1 square diagonally)."""
-        moves = []
-
-        # Jump (1,3) or (3,1) squares in any direction
-        wizard_jumps = [
-            (1, 3),
-            (1, -3),
-            (-1, 3),
-            (-1, -3),
-            (3, 1),
-            (3, -1),
-            (-3, 1),
-            (-3, -1),
-        ]
-
-        for row_offset, col_offset in wizard_jumps:
-            to_pos = from_pos.offset(row_offset, col_offset)
-            if to_pos.is_valid():
-                target_piece = self.get_piece(to_pos)
-                if not target_piece or target_piece.color != piece.color:
-                    moves.append(to_pos)
-
-        # Slide one square diagonally (non-jumping)
-        diagonal_slides = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
-
-        for row_offset, col_offset in diagonal_slides:
-            to_pos = from_pos.offset(row_offset, col_offset)
-            if to_pos.is_valid():
-                target_piece = self.get_piece(to_pos)
-                if not target_piece or target_piece.color != piece.color:
-                    moves.append(to_pos)
-
-        return moves
+        return self._moves_from_mask(
+            WIZARD_ATTACKS[from_pos.row * 8 + from_pos.col], piece
+        )
 
     def _get_dragon_moves(self, from_pos: Position, piece: Piece) -> List[Position]:
         """Get possible moves for a dragon (combines knight and pawn movements)."""
@@ -606,36 +1120,22 @@ class ChessGame:
         direction = 1 if piece.color == Color.WHITE else -1
 
         # Knight moves (L-shaped jumps)
-        knight_offsets = [
-            (2, 1),
-            (2, -1),
-            (-2, 1),
-            (-2, -1),
-            (1, 2),
-            (1, -2),
-            (-1, 2),
-            (-1, -2),
-        ]
-
-        for row_offset, col_offset in knight_offsets:
-            to_pos = from_pos.offset(row_offset, col_offset)
-            if to_pos.is_valid():
-                target_piece = self.get_piece(to_pos)
-                if not target_piece or target_piece.color != piece.color:
-                    moves.append(to_pos)
+        moves.extend(self._get_knight_moves(from_pos, piece))
 
         # Forward move (1 square)
-        forward_pos = from_pos.offset(direction, 0)
-        if forward_pos.is_valid() and not self.get_piece(forward_pos):
-            moves.append(forward_pos)
+        square = from_pos.row * 8 + from_pos.col
+        if 0 <= from_pos.row + direction < 8:
+            forward = square + 8 * direction
+            if not self._occupied() & (1 << forward):
+                moves.append(SQUARES[forward])
 
         # Diagonal captures
-        for col_offset in [-1, 1]:
-            capture_pos = from_pos.offset(direction, col_offset)
-            if capture_pos.is_valid():
-                target_piece = self.get_piece(capture_pos)
-                if target_piece and target_piece.color != piece.color:
-                    moves.append(capture_pos)
+        moves.extend(
+            squares_in(
+                PAWN_ATTACKS[piece.color][square]
+                & self.board.occupancy[piece.color.opposite()]
+            )
+        )
 
         return moves
 
@@ -644,28 +1144,10 @@ class ChessGame:
         moves = []
 
         # Knight moves (L-shaped jumps)
-        knight_offsets = [
-            (2, 1),
-            (2, -1),
-            (-2, 1),
-            (-2, -1),
-            (1, 2),
-            (1, -2),
-            (-1, 2),
-            (-1, -2),
-        ]
-
-        for row_offset, col_offset in knight_offsets:
-            to_pos = from_pos.offset(row_offset, col_offset)
-            if to_pos.is_valid():
-                target_piece = self.get_piece(to_pos)
-                if not target_piece or target_piece.color != piece.color:
-                    moves.append(to_pos)
+        moves.extend(self._get_knight_moves(from_pos, piece))
 
         # Bishop moves (diagonal sliding)
-        diagonal_directions = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
-        bishop_moves = self._get_sliding_moves(from_pos, piece, diagonal_directions)
-        moves.extend(bishop_moves)
+        moves.extend(self._get_bishop_moves(from_pos, piece))
 
         return moves
 
@@ -674,27 +1156,10 @@ class ChessGame:
         moves = []
 
         # Rook moves (sliding orthogonally)
-        rook_directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-        moves.extend(self._get_sliding_moves(from_pos, piece, rook_directions))
+        moves.extend(self._get_rook_moves(from_pos, piece))
 
         # Knight moves (L-shaped jumps)
-        knight_offsets = [
-            (2, 1),
-            (2, -1),
-            (-2, 1),
-            (-2, -1),
-            (1, 2),
-            (1, -2),
-            (-1, 2),
-            (-1, -2),
-        ]
-
-        for row_offset, col_offset in knight_offsets:
-            to_pos = from_pos.offset(row_offset, col_offset)
-            if to_pos.is_valid():
-                target_piece = self.get_piece(to_pos)
-                if not target_piece or target_piece.color != piece.color:
-                    moves.append(to_pos)
+        moves.extend(self._get_knight_moves(from_pos, piece))
 
         return moves
 
@@ -703,67 +1168,25 @@ class ChessGame:
         moves = []
 
         # Queen moves (sliding in all 8 directions)
-        queen_directions = [
-            (0, 1),
-            (0, -1),
-            (1, 0),
-            (-1, 0),
-            (1, 1),
-            (1, -1),
-            (-1, 1),
-            (-1, -1),
-        ]
-        moves.extend(self._get_sliding_moves(from_pos, piece, queen_directions))
+        moves.extend(self._get_queen_moves(from_pos, piece))
 
         # Knight moves (L-shaped jumps)
-        knight_offsets = [
-            (2, 1),
-            (2, -1),
-            (-2, 1),
-            (-2, -1),
-            (1, 2),
-            (1, -2),
-            (-1, 2),
-            (-1, -2),
-        ]
-
-        for row_offset, col_offset in knight_offsets:
-            to_pos = from_pos.offset(row_offset, col_offset)
-            if to_pos.is_valid():
-                target_piece = self.get_piece(to_pos)
-                if not target_piece or target_piece.color != piece.color:
-                    moves.append(to_pos)
+        moves.extend(self._get_knight_moves(from_pos, piece))
 
         return moves
 
     def _get_ship_moves(self, from_pos: Position, piece: Piece) -> List[Position]:
         """Get possible moves for a ship ((2,2)-leaper - diagonal jumps of 2 squares)."""
-        moves = []
-        ship_offsets = [(2, 2), (2, -2), (-2, 2), (-2, -2)]
-
-        for row_offset, col_offset in ship_offsets:
-            to_pos = from_pos.offset(row_offset, col_offset)
-            if to_pos.is_valid():
-                target_piece = self.get_piece(to_pos)
-                if not target_piece or target_piece.color != piece.color:
-                    moves.append(to_pos)
-
-        return moves
+        return self._moves_from_mask(
+            SHIP_ATTACKS[from_pos.row * 8 + from_pos.col], piece
+        )
 
     def _get_king_moves(self, from_pos: Position, piece: Piece) -> List[Position]:
         """Get possible moves for a king, including castling."""
-        moves = []
-
         # Regular king moves (one square in any direction)
-        for row_offset in [-1, 0, 1]:
-            for col_offset in [-1, 0, 1]:
-                if row_offset == 0 and col_offset == 0:
-                    continue
-                to_pos = from_pos.offset(row_offset, col_offset)
-                if to_pos.is_valid():
-                    target_piece = self.get_piece(to_pos)
-                    if not target_piece or target_piece.color != piece.color:
-                        moves.append(to_pos)
+        moves = self._moves_from_mask(
+            KING_ATTACKS[from_pos.row * 8 + from_pos.col], piece
+        )
 
         # Castling
         if not piece.has_moved and not self.is_in_check(piece.color):
@@ -774,11 +1197,11 @@ class ChessGame:
                 kingside_rook
                 and kingside_rook.piece_type == PieceType.ROOK
                 and not kingside_rook.has_moved
+                and from_pos.col + 2 < 8
             ):
                 # Check if squares between king and rook are empty
-                if all(
-                    not self.get_piece(Position(from_pos.row, col))
-                    for col in range(from_pos.col + 1, 7)
+                if not self._occupied() & _rank_span(
+                    from_pos.row, from_pos.col + 1, 7
                 ):
                     # Check if king doesn't pass through check
                     squares_to_check = [from_pos.offset(0, 1), from_pos.offset(0, 2)]
@@ -795,12 +1218,10 @@ class ChessGame:
                 queenside_rook
                 and queenside_rook.piece_type == PieceType.ROOK
                 and not queenside_rook.has_moved
+                and from_pos.col - 2 >= 0
             ):
                 # Check if squares between king and rook are empty
-                if all(
-                    not self.get_piece(Position(from_pos.row, col))
-                    for col in range(1, from_pos.col)
-                ):
+                if not self._occupied() & _rank_span(from_pos.row, 1, from_pos.col):
                     # Check if king doesn't pass through check
                     squares_to_check = [from_pos.offset(0, -1), from_pos.offset(0, -2)]
                     if all(
@@ -813,20 +1234,9 @@ class ChessGame:
 
     def _get_mann_moves(self, from_pos: Position, piece: Piece) -> List[Position]:
         """Get possible moves for a mann (moves like a king, but is not royal)."""
-        moves = []
-
-        # Regular mann moves (one square in any direction)
-        for row_offset in [-1, 0, 1]:
-            for col_offset in [-1, 0, 1]:
-                if row_offset == 0 and col_offset == 0:
-                    continue
-                to_pos = from_pos.offset(row_offset, col_offset)
-                if to_pos.is_valid():
-                    target_piece = self.get_piece(to_pos)
-                    if not target_piece or target_piece.color != piece.color:
-                        moves.append(to_pos)
-
-        return moves
+        return self._moves_from_mask(
+            KING_ATTACKS[from_pos.row * 8 + from_pos.col], piece
+        )
 
     def _get_sliding_moves(
         self, from_pos: Position, piece: Piece, directions: List[Tuple[int, int]]
@@ -837,30 +1247,15 @@ class ChessGame:
         This helper method makes it easy to change how sliding pieces move
         by simply modifying the directions parameter.
         """
-        moves = []
-
-        for row_delta, col_delta in directions:
-            current_pos = from_pos
-            while True:
-                current_pos = current_pos.offset(row_delta, col_delta)
-                if not current_pos.is_valid():
-                    break
-
-                target_piece = self.get_piece(current_pos)
-                if not target_piece:
-                    moves.append(current_pos)
-                elif target_piece.color != piece.color:
-                    moves.append(current_pos)
-                    break
-                else:
-                    break
-
-        return moves
+        attacks = slide_attacks(
+            from_pos.row * 8 + from_pos.col, self._occupied(), directions
+        )
+        return self._moves_from_mask(attacks, piece)
 
     def _is_legal_move(self, from_pos: Position, to_pos: Position) -> bool:
         """Check if a move is legal (doesn't leave king in check)."""
         # Make the move temporarily
-        original_board = deepcopy(self.board)
+        original_board = self.board.copy()
         original_en_passant = self.en_passant_target
 
         self._execute_move_on_board(from_pos, to_pos)
@@ -930,8 +1325,7 @@ class ChessGame:
             return False
 
         # Check if the move is in the list of possible moves
-        possible_moves = self.get_possible_moves(from_pos)
-        if to_pos not in possible_moves:
+        if not self.can_move(from_pos, to_pos):
             return False
 
         # Create move record
@@ -950,14 +1344,8 @@ class ChessGame:
             captured_pawn_pos = to_pos.offset(-direction, 0)
             captured_piece = self.get_piece(captured_pawn_pos)
 
-        move = Move(
-            from_pos=from_pos,
-            to_pos=to_pos,
-            piece=piece,
-            captured_piece=captured_piece,
-            is_castling=is_castling,
-            is_en_passant=is_en_passant,
-            promotion_piece_type=promotion_piece_type,
+        move = Move.pack(
+            from_pos, to_pos, promotion_piece_type, is_castling, is_en_passant
         )
 
         # Execute the move
@@ -1007,133 +1395,106 @@ class ChessGame:
 
         return True
 
+    def king_position(self, color: Color) -> Optional[Position]:
+        """
+        Get the position of the king of the given color, or None if it has none.
+
+        Read from the king bitboard the board keeps up to date, so no scan.
+        """
+        kings = self.board.piece_bitboards.get((color, PieceType.KING), 0)
+        if not kings:
+            return None
+        return SQUARES[(kings & -kings).bit_length() - 1]
+
     def is_in_check(self, color: Color) -> bool:
         """Check if the king of the given color is in check."""
-        # Find the king
-        king_pos = None
-        for pos, piece in self.board.items():
-            if piece.piece_type == PieceType.KING and piece.color == color:
-                king_pos = pos
-                break
-
+        king_pos = self.king_position(color)
         if king_pos is None:
             return False
 
-        return self._is_position_under_attack(king_pos, color)
+        return self._square_attacked_by(king_pos.row * 8 + king_pos.col, color.opposite())
 
     def _is_position_under_attack(self, pos: Position, by_color: Color) -> bool:
         """Check if a position is under attack by the opponent."""
-        opponent_color = by_color.opposite()
-
-        # Check for attacks from each opponent piece
-        for piece_pos, piece in self.board.items():
-            if piece.color != opponent_color:
-                continue
+        if not pos.is_valid():
+            return False
+        return self._square_attacked_by(pos.row * 8 + pos.col, by_color.opposite())
 
-            # Get attacking moves for this piece (without recursively checking for check)
-            if piece.piece_type == PieceType.PAWN:
-                attacking_moves = self._get_pawn_attacking_squares(piece_pos, piece)
-            elif piece.piece_type == PieceType.KNIGHT:
-                attacking_moves = self._get_knight_moves(piece_pos, piece)
-            elif piece.piece_type == PieceType.BISHOP:
-                attacking_moves = self._get_bishop_moves(piece_pos, piece)
-            elif piece.piece_type == PieceType.ROOK:
-                attacking_moves = self._get_rook_moves(piece_pos, piece)
-            elif piece.piece_type == PieceType.QUEEN:
-                attacking_moves = self._get_queen_moves(piece_pos, piece)
-            elif piece.piece_type == PieceType.KING:
-                attacking_moves = self._get_king_attacking_squares(piece_pos, piece)
-            elif piece.piece_type == PieceType.ELEPHANT:
-                attacking_moves = self._get_elephant_moves(piece_pos, piece)
-            elif piece.piece_type == PieceType.GIRAFFE:
-                attacking_moves = self._get_giraffe_moves(piece_pos, piece)
-            elif piece.piece_type == PieceType.UNICORN:
-                attacking_moves = self._get_unicorn_moves(piece_pos, piece)
-            elif piece.piece_type == PieceType.ZEBRA:
-                attacking_moves = self._get_zebra_moves(piece_pos, piece)
-            elif piece.piece_type == PieceType.MANN:
-                attacking_moves = self._get_mann_moves(piece_pos, piece)
-            elif piece.piece_type == PieceType.CENTAUR:
-                attacking_moves = self._get_centaur_moves(piece_pos, piece)
-            elif piece.piece_type == PieceType.CHAMPION:
-                attacking_moves = self._get_champion_moves(piece_pos, piece)
-            elif piece.piece_type == PieceType.WIZARD:
-                attacking_moves = self._get_wizard_moves(piece_pos, piece)
-            elif piece.piece_type == PieceType.CHANCELLOR:
-                attacking_moves = self._get_chancellor_moves(piece_pos, piece)
-            elif piece.piece_type == PieceType.ARCHBISHOP:
-                attacking_moves = self._get_archbishop_moves(piece_pos, piece)
-            elif piece.piece_type == PieceType.AMAZON:
-                attacking_moves = self._get_amazon_moves(piece_pos, piece)
-            elif piece.piece_type == PieceType.DRAGON:
-                attacking_moves = self._get_dragon_moves(piece_pos, piece)
-            elif piece.piece_type == PieceType.SHIP:
-                attacking_moves = self._get_ship_moves(piece_pos, piece)
-            else:
-                attacking_moves = []
+    def _square_attacked_by(
+        self, square: int, attacker: Color, occupied: Optional[int] = None
+    ) -> bool:
+        """
+        Check if any piece of the attacking color attacks a square.
 
-            if pos in attacking_moves:
+        Works backwards from the target square: leap tables and rays cast
+        from it are intersected with the attacker's piece bitboards, so no
+        enemy moves are generated. `occupied` overrides the blocking pieces,
+        for asking about the position after a hypothetical king move.
+        """
+        board = self.board
+        if occupied is None:
+            occupied = board.occupancy[Color.WHITE] | board.occupancy[Color.BLACK]
+        # A piece on the target square itself is being attacked, not attacking
+        attackers = board.occupancy[attacker] & ~(1 << square)
+
+        for table, piece_types in LEAPER_ATTACKERS:
+            if table[square] & attackers & board.pieces(attacker, piece_types):
                 return True
 
-        return False
-
-    def _get_pawn_attacking_squares(
-        self, from_pos: Position, piece: Piece
-    ) -> List[Position]:
-        """Get squares that a pawn is attacking (diagonal squares only)."""
-        direction = 1 if piece.color == Color.WHITE else -1
-        attacking_squares = []
+        # Pawns and dragons capture diagonally forward
+        pawn_like = board.pieces(attacker, (PieceType.PAWN, PieceType.DRAGON))
+        if PAWN_ATTACKS[attacker.opposite()][square] & attackers & pawn_like:
+            return True
 
-        for col_offset in [-1, 1]:
-            attack_pos = from_pos.offset(direction, col_offset)
-            if attack_pos.is_valid():
-                attacking_squares.append(attack_pos)
+        row, col = divmod(square, 8)
 
-        return attacking_squares
+        # A dragon's forward step onto an empty square counts as covering it
+        if not occupied & (1 << square):
+            behind = row - (1 if attacker == Color.WHITE else -1)
+            if 0 <= behind < 8 and attackers & board.pieces(
+                attacker, (PieceType.DRAGON,)
+            ) & (1 << (behind * 8 + col)):
+                return True
 
-    def _get_king_attacking_squares(
-        self, from_pos: Position, piece: Piece
-    ) -> List[Position]:
-        """Get squares that a king is attacking (all adjacent squares)."""
-        attacking_squares = []
+        # Sliders: look outward from the square with the same slide tables
+        orthogonal = attackers & board.pieces(attacker, ORTHOGONAL_SLIDERS)
+        if orthogonal and rook_attacks(square, occupied) & orthogonal:
+            return True
+        diagonal = attackers & board.pieces(attacker, DIAGONAL_SLIDERS)
+        elephants = attackers & board.pieces(attacker, (PieceType.ELEPHANT,))
+        if diagonal or elephants:
+            diagonal_attacks = bishop_attacks(square, occupied)
+            if diagonal_attacks & (diagonal | elephants & ELEPHANT_REACH[square]):
+                return True
 
-        for row_offset in [-1, 0, 1]:
-            for col_offset in [-1, 0, 1]:
-                if row_offset == 0 and col_offset == 0:
-                    continue
-                attack_pos = from_pos.offset(row_offset, col_offset)
-                if attack_pos.is_valid():
-                    attacking_squares.append(attack_pos)
+        # Unicorns (nightriders) slide along knight steps until blocked
+        unicorns = attackers & board.pieces(attacker, (PieceType.UNICORN,))
+        if unicorns:
+            for row_delta, col_delta in KNIGHT_DIRECTIONS:
+                to_row, to_col = row + row_delta, col + col_delta
+                while 0 <= to_row < 8 and 0 <= to_col < 8:
+                    bit = 1 << (to_row * 8 + to_col)
+                    if occupied & bit:
+                        if unicorns & bit:
+                            return True
+                        break
+                    to_row, to_col = to_row + row_delta, to_col + col_delta
 
-        return attacking_squares
+        return False
 
     def is_checkmate(self) -> bool:
         """Check if the current player is in checkmate."""
         if not self.is_in_check(self.current_turn):
             return False
 
-        # Check if any legal move exists
-        # Use list() to create a snapshot to avoid "dictionary changed during iteration"
-        for pos, piece in list(self.board.items()):
-            if piece.color == self.current_turn:
-                if len(self.get_possible_moves(pos)) > 0:
-                    return False
-
-        return True
+        return not self.has_legal_moves()
 
     def is_stalemate(self) -> bool:
         """Check if the game is in stalemate."""
         if self.is_in_check(self.current_turn):
             return False
 
-        # Check if any legal move exists
-        # Use list() to create a snapshot to avoid "dictionary changed during iteration"
-        for pos, piece in list(self.board.items()):
-            if piece.color == self.current_turn:
-                if len(self.get_possible_moves(pos)) > 0:
-                    return False
-
-        return True
+        return not self.has_legal_moves()
 
     def is_fifty_move_draw(self) -> bool:
         """Check if the game is a draw by the 50-move rule."""
@@ -1146,17 +1507,15 @@ class ChessGame:
 
     def is_insufficient_material(self) -> bool:
         """Check if the game is a draw due to insufficient material (only kings remaining)."""
-        # Count all pieces on the board
-        piece_count = len(self.board)
-
-        # If only 2 pieces remain, check if they are both kings
-        if piece_count == 2:
-            for piece in self.board.values():
-                if piece.piece_type != PieceType.KING:
-                    return False
-            return True
+        # Only 2 pieces may remain, and both must be kings
+        occupied = self._occupied()
+        if occupied.bit_count() != 2:
+            return False
 
-        return False
+        kings = self.board.pieces(Color.WHITE, (PieceType.KING,)) | self.board.pieces(
+            Color.BLACK, (PieceType.KING,)
+        )
+        return kings == occupied
 
     def is_game_over(self) -> bool:
         """Check if the game is over."""
@@ -1168,29 +1527,65 @@ class ChessGame:
             or self.is_insufficient_material()
         )
 
-    def get_game_result(self) -> Optional[str]:
-        """Get the result of the game."""
+    def get_end_state(self) -> Optional[Tuple[str, bool, bool]]:
+        """
+        Get the game result together with its checkmate and stalemate flags.
+
+        Returns None while the game is still in progress, otherwise a
+        (result, is_checkmate, is_stalemate) tuple.
+        """
         if self.is_checkmate():
             winner = self.current_turn.opposite()
-            return f"{winner.value} wins by checkmate"
+            return f"{winner.value} wins by checkmate", True, False
         elif self.is_stalemate():
-            return "Draw by stalemate"
+            return "Draw by stalemate", False, True
         elif self.is_fifty_move_draw():
-            return "Draw by fifty-move rule"
+            return "Draw by fifty-move rule", False, False
         elif self.is_threefold_repetition():
-            return "Draw by threefold repetition"
+            return "Draw by threefold repetition", False, False
         elif self.is_insufficient_material():
-            return "Draw by insufficient material"
+            return "Draw by insufficient material", False, False
         return None
 
+    def get_game_result(self) -> Optional[str]:
+        """Get the result of the game."""
+        end_state = self.get_end_state()
+        return end_state[0] if end_state else None
+
+    def board_to_dict(self) -> Dict[str, Dict[str, str]]:
+        """
+        Map "row,col" to the type and color of the piece on that square.
+
+        The result is memoized until the board changes and is shared between
+        callers, so it must not be modified.
+        """
+        if self._board_cache_key != self.board.zobrist_hash or self._board_dict_cache is None:
+            self._board_dict_cache = {
+                key: {
+                    "piece_type": piece.piece_type.value if hasattr(piece.piece_type, 'value') else piece.piece_type,
+                    "color": piece.color.value,
+                }
+                for key, piece in zip(SQUARE_KEYS, self.board.mailbox)
+                if piece is not None
+            }
+            self._board_json_cache = None
+            self._board_cache_key = self.board.zobrist_hash
+        return self._board_dict_cache
+
+    def board_to_json(self) -> str:
+        """board_to_dict() serialized to JSON, memoized alongside it."""
+        board_dict = self.board_to_dict()
+        if self._board_json_cache is None:
+            self._board_json_cache = json.dumps(board_dict, separators=(",", ":"))
+        return self._board_json_cache
+
     def display_board(self) -> str:
         """Return a string representation of the board."""
         lines = []
         lines.append("  a b c d e f g h")
         for row in range(7, -1, -1):
             line = f"{row + 1} "
-            for col in range(8):
-                piece = self.get_piece(Position(row, col))
+            for piece in self.board.mailbox[row * 8 : row * 8 + 8]:
                 if piece:
                     line += str(piece) + " "
                 else:
@@ -1199,3 +1594,30 @@ class ChessGame:
             lines.append(line)
         lines.append("  a b c d e f g h")
         return "\n".join(lines)
+
+
+# Pseudo-legal move generator for each piece type. Pieces with a type that
+# isn't listed have no moves.
+MOVE_GENERATORS: Dict[
+    PieceType, Callable[[ChessGame, Position, Piece], List[Position]]
+] = {
+    PieceType.PAWN: ChessGame._get_pawn_moves,
+    PieceType.ROOK: ChessGame._get_rook_moves,
+    PieceType.KNIGHT: ChessGame._get_knight_moves,
+    PieceType.BISHOP: ChessGame._get_bishop_moves,
+    PieceType.QUEEN: ChessGame._get_queen_moves,
+    PieceType.KING: ChessGame._get_king_moves,
+    PieceType.MANN: ChessGame._get_mann_moves,
+    PieceType.ELEPHANT: ChessGame._get_elephant_moves,
+    PieceType.GIRAFFE: ChessGame._get_giraffe_moves,
+    PieceType.UNICORN: ChessGame._get_unicorn_moves,
+    PieceType.ZEBRA: ChessGame._get_zebra_moves,
+    PieceType.CENTAUR: ChessGame._get_centaur_moves,
+    PieceType.CHAMPION: ChessGame._get_champion_moves,
+    PieceType.WIZARD: ChessGame._get_wizard_moves,
+    PieceType.CHANCELLOR: ChessGame._get_chancellor_moves,
+    PieceType.ARCHBISHOP: ChessGame._get_archbishop_moves,
+    PieceType.AMAZON: ChessGame._get_amazon_moves,
+    PieceType.DRAGON: ChessGame._get_dragon_moves,
+    PieceType.SHIP: ChessGame._get_ship_moves,
+}
@@ -1,16 +1,33 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Dict, Optional
+from starlette.websockets import WebSocketState
+from typing import Awaitable, Callable, List, Dict, Optional, Tuple
+from collections import deque
+from dataclasses import dataclass
 import uuid
 import json
+import logging
 import asyncio
 import time
-from chess_game import ChessGame, Color, Position, PieceType, Piece
+from chess_game import (
+    ChessGame, Color, Move, Position, PieceType, Piece, squares_in, rook_attacks, bishop_attacks,
+    KNIGHT_ATTACKS, KING_ATTACKS, GIRAFFE_ATTACKS, ZEBRA_ATTACKS, SHIP_ATTACKS, ELEPHANT_REACH,
+    CHAMPION_ATTACKS, WIZARD_ATTACKS, PAWN_ATTACKS, ORTHOGONAL_SLIDERS, DIAGONAL_SLIDERS,
+    KNIGHT_DIRECTIONS,
+)
+
+logger = logging.getLogger(__name__)
 
 # Time control configuration
 STARTING_TIME_SECONDS = 180.0  # Initial time for each player in seconds
 INCREMENT_SECONDS = 3.0  # Time added after each move in seconds
 
+# Compact JSON encoder shared by every outgoing message
+dumps = json.JSONEncoder(separators=(",", ":")).encode
+
+# Promotion strings accepted from clients, mapped straight to their piece type
+PROMOTION_TYPES: Dict[str, PieceType] = {piece_type.value: piece_type for piece_type in PieceType}
+
 app = FastAPI()
 
 # Configure CORS
@@ -27,144 +44,268 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# game_over message sent to the remaining player, by winner color, when the opponent leaves
+RESIGNATION_MESSAGES: Dict[Color, str] = {
+    color: dumps({
+        "type": "game_over",
+        "result": f"{color.value} wins by resignation",
+        "is_checkmate": False,
+        "is_stalemate": False
+    })
+    for color in Color
+}
+
+# Leap tables making up each piece type's premove targets
+PREMOVE_LEAPS: Dict[PieceType, Tuple[List[int], ...]] = {
+    PieceType.KNIGHT: (KNIGHT_ATTACKS,),
+    PieceType.KING: (KING_ATTACKS,),
+    PieceType.MANN: (KING_ATTACKS,),
+    PieceType.ELEPHANT: (ELEPHANT_REACH,),
+    PieceType.GIRAFFE: (GIRAFFE_ATTACKS,),
+    PieceType.CENTAUR: (KNIGHT_ATTACKS, KING_ATTACKS),
+    PieceType.CHAMPION: (CHAMPION_ATTACKS,),
+    PieceType.WIZARD: (WIZARD_ATTACKS,),
+    PieceType.AMAZON: (KNIGHT_ATTACKS,),
+    PieceType.DRAGON: (KNIGHT_ATTACKS,),
+    PieceType.ZEBRA: (ZEBRA_ATTACKS,),
+    PieceType.CHANCELLOR: (KNIGHT_ATTACKS,),
+    PieceType.ARCHBISHOP: (KNIGHT_ATTACKS,),
+    PieceType.SHIP: (SHIP_ATTACKS,),
+}
+
+
+def _premove_reach(piece_type: PieceType, color: Color, has_moved: bool, square: int) -> int:
+    """Bitboard of every square a piece could move to from a square on an empty board."""
+    row, col = divmod(square, 8)
+    reach = 0
+    for table in PREMOVE_LEAPS.get(piece_type, ()):
+        reach |= table[square]
+    if piece_type in ORTHOGONAL_SLIDERS:
+        reach |= rook_attacks(square, 0)
+    if piece_type in DIAGONAL_SLIDERS:
+        reach |= bishop_attacks(square, 0)
+
+    if piece_type == PieceType.UNICORN:
+        # Knight moves repeated in the same direction up to the board edge
+        for row_delta, col_delta in KNIGHT_DIRECTIONS:
+            to_row, to_col = row + row_delta, col + col_delta
+            while 0 <= to_row < 8 and 0 <= to_col < 8:
+                reach |= 1 << (to_row * 8 + to_col)
+                to_row, to_col = to_row + row_delta, to_col + col_delta
+
+    if piece_type in (PieceType.PAWN, PieceType.DRAGON):
+        # One step forward (two for an unmoved pawn) and both diagonal captures
+        direction = 1 if color == Color.WHITE else -1
+        steps = (1, 2) if piece_type == PieceType.PAWN and not has_moved else (1,)
+        for step in steps:
+            if 0 <= row + step * direction < 8:
+                reach |= 1 << (square + step * direction * 8)
+        reach |= PAWN_ATTACKS[color][square]
+
+    if piece_type == PieceType.KING and not has_moved:
+        # Castling squares two files to either side
+        for to_col in (col - 2, col + 2):
+            if 0 <= to_col < 8:
+                reach |= 1 << (row * 8 + to_col)
+    return reach
+
+
+# Premove targets per (piece type, color, has_moved), indexed by square, built once
+PREMOVE_TARGETS: Dict[Tuple[PieceType, Color, bool], List[List[Position]]] = {
+    (piece_type, color, has_moved): [
+        squares_in(_premove_reach(piece_type, color, has_moved, square)) for square in range(64)
+    ]
+    for piece_type in PieceType
+    for color in Color
+    for has_moved in (False, True)
+}
+
+
+@dataclass(slots=True)
+class Premove:
+    """A move queued by a player while waiting for their turn."""
+
+    from_pos: Position
+    to_pos: Position
+    promotion: Optional[PieceType] = None
+
+
+# A queued request: (kind, player websocket, from, to, optional promotion string).
+# The kind is "move" or "cancel_premove"; a cancel carries no squares.
+MoveRequest = Tuple[str, WebSocket, Optional[Position], Optional[Position], Optional[str]]
+
+
+def batch_messages(messages: List[str]) -> str:
+    """Combine serialized server events into a single frame; one event is sent as is."""
+    if len(messages) == 1:
+        return messages[0]
+    return '{"type":"multi","events":[' + ",".join(messages) + "]}"
+
+
 class Room:
     def __init__(self, player1: WebSocket, player2: WebSocket) -> None:
         self.id = str(uuid.uuid4())
         self.player1 = player1
         self.player2 = player2
         self.game = ChessGame()
-        self.premoves: Dict[WebSocket, Dict] = {}  # Store premoves per player
+        self.premoves: Dict[WebSocket, Premove] = {}  # Store premoves per player
         self.game_ended = False  # Track if game has ended by any means
+        self.game_over_message: Optional[str] = None  # Serialized once when the game ends
         self.player_names: Dict[WebSocket, str] = {player1: "Guest", player2: "Guest"}  # Store player names
+        # Per-connection color and opponent, resolved once instead of on every move
+        self.player_colors: Dict[WebSocket, Color] = {player1: Color.WHITE, player2: Color.BLACK}
+        self.opponents: Dict[WebSocket, WebSocket] = {player1: player2, player2: player1}
+        # Bound send methods with each player's color, resolved once for the broadcast paths
+        self.send_targets: List[Tuple[WebSocket, Color, Callable[[str], Awaitable[None]]]] = [
+            (player1, Color.WHITE, player1.send_text),
+            (player2, Color.BLACK, player2.send_text),
+        ]
 
         # Time controls: each player starts with configured time
         self.time_remaining: Dict[Color, float] = {
             Color.WHITE: STARTING_TIME_SECONDS,
             Color.BLACK: STARTING_TIME_SECONDS
         }
-        self.last_move_time: Optional[float] = None  # Timestamp of last move
+        self.last_move_time: Optional[float] = None  # time.monotonic() of last move
         self.time_update_task: Optional[asyncio.Task] = None  # Background task for time updates
 
+        # Moves are applied one at a time by a single consumer task per room
+        self.move_queue: asyncio.Queue[MoveRequest] = asyncio.Queue()
+        self.move_task: Optional[asyncio.Task] = None
+
+        # Board last broadcast to the players; later broadcasts only send changed squares
+        self.last_board: Optional[Dict[str, Dict[str, str]]] = None
+
+        # While a move is being applied, outgoing messages collect here per send
+        # method and go out as one frame per player when the move is done
+        self.outbox: Optional[Dict[Callable[[str], Awaitable[None]], List[str]]] = None
+
+    async def _send_all(self, outgoing: List[Tuple[Callable[[str], Awaitable[None]], str]]) -> None:
+        """Write every (send, message) pair concurrently, ignoring closed connections."""
+        if self.outbox is not None:
+            for send, message in outgoing:
+                self.outbox.setdefault(send, []).append(message)
+            return
+        results = await asyncio.gather(
+            *(send(message) for send, message in outgoing), return_exceptions=True
+        )
+        for result in results:
+            # RuntimeError means the player connection is already closed
+            if isinstance(result, BaseException) and not isinstance(result, RuntimeError):
+                raise result
+
     async def notify_players(self, message: str) -> None:
-        try:
-            await self.player1.send_text(message)
-        except RuntimeError:
-            pass  # Player1 connection already closed
-        try:
-            await self.player2.send_text(message)
-        except RuntimeError:
-            pass  # Player2 connection already closed
+        await self._send_all([(send, message) for _, _, send in self.send_targets])
 
     async def broadcast_board_state(self) -> None:
         """Broadcast the current board state to all players as a structured JSON object."""
-        # Send personalized board state to each player with their color
-        for player, color in [(self.player1, Color.WHITE), (self.player2, Color.BLACK)]:
-            # Create a snapshot of the board to avoid dictionary modification during iteration
-            board_snapshot = list(self.game.board.items())
+        # Create a snapshot of the board to avoid dictionary modification during iteration
+        board_snapshot = list(self.game.board.items())
+
+        # Fields identical for both players are serialized once and shared
+        shared_state = {
+            "type": "board_state",
+            "current_turn": self.game.current_turn.value,
+            "room_id": self.id,
+            "white_time": round(self.time_remaining[Color.WHITE], 1),
+            "black_time": round(self.time_remaining[Color.BLACK], 1),
+            "captured_pieces": {
+                "white": [
+                    {
+                        "piece_type": piece.piece_type.value if hasattr(piece.piece_type, 'value') else piece.piece_type,
+                        "color": piece.color.value
+                    }
+                    for piece in self.game.captured_pieces[Color.WHITE]
+                ],
+                "black": [
+                    {
+                        "piece_type": piece.piece_type.value if hasattr(piece.piece_type, 'value') else piece.piece_type,
+                        "color": piece.color.value
+                    }
+                    for piece in self.game.captured_pieces[Color.BLACK]
+                ]
+            }
+        }
 
+        # Add last move information if there is a move history
+        if self.game.move_history:
+            last_move = self.game.move_history[-1]
+            shared_state["last_move"] = {
+                "from": {"row": last_move.from_pos.row, "col": last_move.from_pos.col},
+                "to": {"row": last_move.to_pos.row, "col": last_move.to_pos.col}
+            }
+
+        # The first broadcast carries the whole board, pre-serialized by the game's
+        # cache; after that only squares that changed are sent, null for emptied ones
+        board = self.game.board_to_dict()
+        previous_board, self.last_board = self.last_board, board
+        if previous_board is None:
+            board_field = ',"board":' + self.game.board_to_json()
+        else:
+            board_field = ',"board_changes":' + dumps({
+                key: board.get(key)
+                for key in previous_board.keys() | board.keys()
+                if board.get(key) != previous_board.get(key)
+            })
+
+        # The shared object minus its closing brace plus the board; each player's
+        # fields are spliced on after it
+        shared_prefix = dumps(shared_state)[:-1] + board_field
+
+        # Build a personalized board state for each player with their color
+        outgoing: List[Tuple[Callable[[str], Awaitable[None]], str]] = []
+        for player, color, send in self.send_targets:
             # Get opponent websocket
-            opponent = self.player2 if player == self.player1 else self.player1
+            opponent = self.opponents[player]
 
             board_state = {
-                "type": "board_state",
-                "board": {
-                    f"{pos.row},{pos.col}": {
-                        "piece_type": piece.piece_type.value if hasattr(piece.piece_type, 'value') else piece.piece_type,
-                        "color": piece.color.value
-                    }
-                    for pos, piece in board_snapshot
-                },
-                "current_turn": self.game.current_turn.value,
-                "room_id": self.id,
                 "player_color": color.value,
                 "opponent_name": self.player_names[opponent],
-                "white_time": round(self.time_remaining[Color.WHITE], 1),
-                "black_time": round(self.time_remaining[Color.BLACK], 1),
-                "captured_pieces": {
-                    "white": [
-                        {
-                            "piece_type": piece.piece_type.value if hasattr(piece.piece_type, 'value') else piece.piece_type,
-                            "color": piece.color.value
-                        }
-                        for piece in self.game.captured_pieces[Color.WHITE]
-                    ],
-                    "black": [
-                        {
-                            "piece_type": piece.piece_type.value if hasattr(piece.piece_type, 'value') else piece.piece_type,
-                            "color": piece.color.value
-                        }
-                        for piece in self.game.captured_pieces[Color.BLACK]
-                    ]
-                }
             }
 
-            # Add last move information if there is a move history
-            if self.game.move_history:
-                last_move = self.game.move_history[-1]
-                board_state["last_move"] = {
-                    "from": {"row": last_move.from_pos.row, "col": last_move.from_pos.col},
-                    "to": {"row": last_move.to_pos.row, "col": last_move.to_pos.col}
-                }
-
             # Add check status and king position for both players
             # Check if this player's king is in check
-            if self.game.is_in_check(color):
-                for pos, piece in board_snapshot:
-                    if piece.piece_type == PieceType.KING and piece.color == color:
-                        board_state["in_check"] = True
-                        board_state["king_position"] = {"row": pos.row, "col": pos.col}
-                        break
+            king_pos = self.game.king_position(color)
+            if king_pos is not None and self.game.is_in_check(color):
+                board_state["in_check"] = True
+                board_state["king_position"] = {"row": king_pos.row, "col": king_pos.col}
 
             # Check if opponent's king is in check
             opponent_color = Color.BLACK if color == Color.WHITE else Color.WHITE
-            if self.game.is_in_check(opponent_color):
-                for pos, piece in board_snapshot:
-                    if piece.piece_type == PieceType.KING and piece.color == opponent_color:
-                        board_state["opponent_in_check"] = True
-                        board_state["opponent_king_position"] = {"row": pos.row, "col": pos.col}
-                        break
+            opponent_king_pos = self.game.king_position(opponent_color)
+            if opponent_king_pos is not None and self.game.is_in_check(opponent_color):
+                board_state["opponent_in_check"] = True
+                board_state["opponent_king_position"] = {
+                    "row": opponent_king_pos.row,
+                    "col": opponent_king_pos.col,
+                }
 
             # Add available moves for the player whose turn it is
             if color == self.game.current_turn:
-                available_moves = {}
-                for pos, piece in board_snapshot:
-                    if piece.color == color:
-                        moves = self.game.get_possible_moves(pos)
-                        if moves:
-                            available_moves[f"{pos.row},{pos.col}"] = [
-                                {"row": move.row, "col": move.col} for move in moves
-                            ]
-                board_state["available_moves"] = available_moves
+                # Moves are packed as ints in Move's from/to layout
+                board_state["available_moves"] = self.game.legal_moves_packed()
             else:
                 # Add available premove moves for the player waiting for their turn
-                premove_moves = {}
+                premove_moves = []
                 for pos, piece in board_snapshot:
                     if piece.color == color:
                         # For premoves, show all theoretically possible moves for the piece
                         # This will be validated when the premove is actually attempted
-                        moves = self._get_theoretical_moves(pos, piece)
-                        if moves:
-                            premove_moves[f"{pos.row},{pos.col}"] = [
-                                {"row": move.row, "col": move.col} for move in moves
-                            ]
+                        premove_moves.extend(
+                            int(Move.pack(pos, move)) for move in self._get_theoretical_moves(pos, piece)
+                        )
                 board_state["premove_available_moves"] = premove_moves
 
-            message = json.dumps(board_state)
-            try:
-                await player.send_text(message)
-            except RuntimeError:
-                pass  # Player connection already closed
+            outgoing.append((send, shared_prefix + "," + dumps(board_state)[1:]))
+
+        await self._send_all(outgoing)
 
     def has_player(self, websocket: WebSocket) -> bool:
         return websocket == self.player1 or websocket == self.player2
 
     def get_player_color(self, websocket: WebSocket) -> Optional[Color]:
         """Get the color assigned to a player's websocket."""
-        if websocket == self.player1:
-            return Color.WHITE
-        elif websocket == self.player2:
-            return Color.BLACK
-        return None
+        return self.player_colors.get(websocket)
 
     def set_player_name(self, websocket: WebSocket, name: str) -> None:
         """Set the name for a player."""
@@ -178,334 +319,175 @@ class Room:
         the current board state. This allows premoves to capture pieces that will
         move into position, or move to squares that will become available.
         """
-        moves = []
-
-        if piece.piece_type == PieceType.PAWN:
-            # Pawns can move forward 1 or 2 squares (if not moved) and capture diagonally
-            direction = 1 if piece.color == Color.WHITE else -1
-
-            # Forward moves (1 square)
-            forward_pos = from_pos.offset(direction, 0)
-            if forward_pos.is_valid():
-                moves.append(forward_pos)
-
-            # Double move (2 squares) - only from starting position
-            if not piece.has_moved:
-                double_forward = from_pos.offset(2 * direction, 0)
-                if double_forward.is_valid():
-                    moves.append(double_forward)
-
-            # Diagonal captures (both directions)
-            for col_offset in [-1, 1]:
-                capture_pos = from_pos.offset(direction, col_offset)
-                if capture_pos.is_valid():
-                    moves.append(capture_pos)
-
-        elif piece.piece_type == PieceType.KNIGHT:
-            # Knights can jump to 8 possible squares
-            knight_offsets = [
-                (2, 1), (2, -1), (-2, 1), (-2, -1),
-                (1, 2), (1, -2), (-1, 2), (-1, -2)
-            ]
-            for row_offset, col_offset in knight_offsets:
-                to_pos = from_pos.offset(row_offset, col_offset)
-                if to_pos.is_valid():
-                    moves.append(to_pos)
-
-        elif piece.piece_type == PieceType.KING:
-            # Kings can move one square in any direction
-            for row_offset in [-1, 0, 1]:
-                for col_offset in [-1, 0, 1]:
-                    if row_offset == 0 and col_offset == 0:
-                        continue
-                    to_pos = from_pos.offset(row_offset, col_offset)
-                    if to_pos.is_valid():
-                        moves.append(to_pos)
-
-            # Castling squares (if king hasn't moved)
-            if not piece.has_moved:
-                # Kingside castling
-                kingside_pos = from_pos.offset(0, 2)
-                if kingside_pos.is_valid():
-                    moves.append(kingside_pos)
-                # Queenside castling
-                queenside_pos = from_pos.offset(0, -2)
-                if queenside_pos.is_valid():
-                    moves.append(queenside_pos)
-
-        elif piece.piece_type == PieceType.MANN:
-            # Mann moves one square in any direction (like king but non-royal)
-            for row_offset in [-1, 0, 1]:
-                for col_offset in [-1, 0, 1]:
-                    if row_offset == 0 and col_offset == 0:
-                        continue
-                    to_pos = from_pos.offset(row_offset, col_offset)
-                    if to_pos.is_valid():
-                        moves.append(to_pos)
-
-        elif piece.piece_type in [PieceType.ROOK, PieceType.BISHOP, PieceType.QUEEN]:
-            # Sliding pieces - show all squares in their movement directions
-            if piece.piece_type == PieceType.ROOK:
-                directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-            elif piece.piece_type == PieceType.BISHOP:
-                directions = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
-            else:  # QUEEN
-                directions = [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)]
-
-            for row_delta, col_delta in directions:
-                current_pos = from_pos
-                # Continue sliding until we hit the board edge
-                while True:
-                    current_pos = current_pos.offset(row_delta, col_delta)
-                    if not current_pos.is_valid():
-                        break
-                    moves.append(current_pos)
-
-        elif piece.piece_type == PieceType.ELEPHANT:
-            # Elephant moves diagonally up to 2 squares
-            directions = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
-            for row_delta, col_delta in directions:
-                for distance in range(1, 3):  # Max 2 squares
-                    to_pos = from_pos.offset(row_delta * distance, col_delta * distance)
-                    if to_pos.is_valid():
-                        moves.append(to_pos)
-
-        elif piece.piece_type == PieceType.GIRAFFE:
-            # Giraffe moves 4 squares in one direction, 1 in perpendicular
-            giraffe_offsets = [
-                (4, 1), (4, -1), (-4, 1), (-4, -1),
-                (1, 4), (1, -4), (-1, 4), (-1, -4)
-            ]
-            for row_offset, col_offset in giraffe_offsets:
-                to_pos = from_pos.offset(row_offset, col_offset)
-                if to_pos.is_valid():
-                    moves.append(to_pos)
-
-        elif piece.piece_type == PieceType.UNICORN:
-            # Unicorn (nightrider) - sliding knight moves
-            knight_offsets = [
-                (2, 1), (2, -1), (-2, 1), (-2, -1),
-                (1, 2), (1, -2), (-1, 2), (-1, -2)
-            ]
-            for row_delta, col_delta in knight_offsets:
-                current_pos = from_pos
-                # Continue sliding in knight-move increments until we hit the board edge
-                while True:
-                    current_pos = current_pos.offset(row_delta, col_delta)
-                    if not current_pos.is_valid():
-                        break
-                    moves.append(current_pos)
-
-        elif piece.piece_type == PieceType.CENTAUR:
-            # Centaur combines knight and king movements
-            # Knight moves
-            knight_offsets = [
-                (2, 1), (2, -1), (-2, 1), (-2, -1),
-                (1, 2), (1, -2), (-1, 2), (-1, -2)
-            ]
-            for row_offset, col_offset in knight_offsets:
-                to_pos = from_pos.offset(row_offset, col_offset)
-                if to_pos.is_valid():
-                    moves.append(to_pos)
-
-            # King moves (one square in any direction)
-            for row_offset in [-1, 0, 1]:
-                for col_offset in [-1, 0, 1]:
-                    if row_offset == 0 and col_offset == 0:
-                        continue
-                    to_pos = from_pos.offset(row_offset, col_offset)
-                    if to_pos.is_valid():
-                        moves.append(to_pos)
-
-        elif piece.piece_type == PieceType.CHAMPION:
-            # Champion: jumps 2 squares orthogonally/diagonally or slides 1 square orthogonally
-            # Jump two squares orthogonally
-            orthogonal_jumps = [
-                (2, 0), (-2, 0), (0, 2), (0, -2)
-            ]
-            for row_offset, col_offset in orthogonal_jumps:
-                to_pos = from_pos.offset(row_offset, col_offset)
-                if to_pos.is_valid():
-                    moves.append(to_pos)
-
-            # Jump two squares diagonally
-            diagonal_jumps = [
-                (2, 2), (2, -2), (-2, 2), (-2, -2)
-            ]
-            for row_offset, col_offset in diagonal_jumps:
-                to_pos = from_pos.offset(row_offset, col_offset)
-                if to_pos.is_valid():
-                    moves.append(to_pos)
-
-            # Slide one square orthogonally (non-jumping)
-            orthogonal_slides = [
-                (1, 0), (-1, 0), (0, 1), (0, -1)
-            ]
-            for row_offset, col_offset in orthogonal_slides:
-                to_pos = from_pos.offset(row_offset, col_offset)
-                if to_pos.is_valid():
-                    moves.append(to_pos)
-
-        elif piece.piece_type == PieceType.WIZARD:
-            # Wizard: jumps (1,3) or (3,1) or slides 1 square diagonally
-            # Jump (1,3) or (3,1) squares
-            wizard_jumps = [
-                (1, 3), (1, -3), (-1, 3), (-1, -3),
-                (3, 1), (3, -1), (-3, 1), (-3, -1)
-            ]
-            for row_offset, col_offset in wizard_jumps:
-                to_pos = from_pos.offset(row_offset, col_offset)
-                if to_pos.is_valid():
-                    moves.append(to_pos)
-
-            # Slide one square diagonally (non-jumping)
-            diagonal_slides = [
-                (1, 1), (1, -1), (-1, 1), (-1, -1)
-            ]
-            for row_offset, col_offset in diagonal_slides:
-                to_pos = from_pos.offset(row_offset, col_offset)
-                if to_pos.is_valid():
-                    moves.append(to_pos)
-
-        elif piece.piece_type == PieceType.AMAZON:
-            # Amazon combines queen and knight movements
-            # Queen moves (sliding in all 8 directions)
-            queen_directions = [(0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)]
-            for row_delta, col_delta in queen_directions:
-                current_pos = from_pos
-                # Continue sliding until we hit the board edge
-                while True:
-                    current_pos = current_pos.offset(row_delta, col_delta)
-                    if not current_pos.is_valid():
-                        break
-                    moves.append(current_pos)
-
-            # Knight moves
-            knight_offsets = [
-                (2, 1), (2, -1), (-2, 1), (-2, -1),
-                (1, 2), (1, -2), (-1, 2), (-1, -2)
-            ]
-            for row_offset, col_offset in knight_offsets:
-                to_pos = from_pos.offset(row_offset, col_offset)
-                if to_pos.is_valid():
-                    moves.append(to_pos)
-
-        elif piece.piece_type == PieceType.DRAGON:
-            # Dragon combines knight and pawn movements
-            direction = 1 if piece.color == Color.WHITE else -1
-
-            # Knight moves
-            knight_offsets = [
-                (2, 1), (2, -1), (-2, 1), (-2, -1),
-                (1, 2), (1, -2), (-1, 2), (-1, -2)
-            ]
-            for row_offset, col_offset in knight_offsets:
-                to_pos = from_pos.offset(row_offset, col_offset)
-                if to_pos.is_valid():
-                    moves.append(to_pos)
-
-            # Forward move (1 square)
-            forward_pos = from_pos.offset(direction, 0)
-            if forward_pos.is_valid():
-                moves.append(forward_pos)
-
-            # Diagonal captures
-            for col_offset in [-1, 1]:
-                capture_pos = from_pos.offset(direction, col_offset)
-                if capture_pos.is_valid():
-                    moves.append(capture_pos)
-
-        elif piece.piece_type == PieceType.ZEBRA:
-            # Zebra moves (2,3)-leaper
-            zebra_offsets = [
-                (2, 3), (2, -3), (-2, 3), (-2, -3),
-                (3, 2), (3, -2), (-3, 2), (-3, -2)
-            ]
-            for row_offset, col_offset in zebra_offsets:
-                to_pos = from_pos.offset(row_offset, col_offset)
-                if to_pos.is_valid():
-                    moves.append(to_pos)
-
-        elif piece.piece_type == PieceType.CHANCELLOR:
-            # Chancellor combines rook and knight movements
-            # Rook moves (sliding orthogonally)
-            rook_directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-            for row_delta, col_delta in rook_directions:
-                current_pos = from_pos
-                # Continue sliding until we hit the board edge
-                while True:
-                    current_pos = current_pos.offset(row_delta, col_delta)
-                    if not current_pos.is_valid():
-                        break
-                    moves.append(current_pos)
-
-            # Knight moves
-            knight_offsets = [
-                (2, 1), (2, -1), (-2, 1), (-2, -1),
-                (1, 2), (1, -2), (-1, 2), (-1, -2)
-            ]
-            for row_offset, col_offset in knight_offsets:
-                to_pos = from_pos.offset(row_offset, col_offset)
-                if to_pos.is_valid():
-                    moves.append(to_pos)
-
-        elif piece.piece_type == PieceType.ARCHBISHOP:
-            # Archbishop combines bishop and knight movements
-            # Bishop moves (sliding diagonally)
-            bishop_directions = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
-            for row_delta, col_delta in bishop_directions:
-                current_pos = from_pos
-                # Continue sliding until we hit the board edge
-                while True:
-                    current_pos = current_pos.offset(row_delta, col_delta)
-                    if not current_pos.is_valid():
-                        break
-                    moves.append(current_pos)
-
-            # Knight moves
-            knight_offsets = [
-                (2, 1), (2, -1), (-2, 1), (-2, -1),
-                (1, 2), (1, -2), (-1, 2), (-1, -2)
-            ]
-            for row_offset, col_offset in knight_offsets:
-                to_pos = from_pos.offset(row_offset, col_offset)
-                if to_pos.is_valid():
-                    moves.append(to_pos)
-
-        elif piece.piece_type == PieceType.SHIP:
-            # Ship moves (2,2)-leaper - diagonal jumps of 2 squares
-            ship_offsets = [
-                (2, 2), (2, -2), (-2, 2), (-2, -2)
-            ]
-            for row_offset, col_offset in ship_offsets:
-                to_pos = from_pos.offset(row_offset, col_offset)
-                if to_pos.is_valid():
-                    moves.append(to_pos)
-
-        return moves
+        targets = PREMOVE_TARGETS.get((piece.piece_type, piece.color, piece.has_moved))
+        if targets is None:
+            return []  # Unknown piece types have no premoves
+        return list(targets[from_pos.row * 8 + from_pos.col])
 
     def is_valid_premove(self, from_pos: Position, to_pos: Position, player_color: Color) -> bool:
         """Check if a move could possibly be valid for the player when it becomes their turn."""
-        # Check if there's a piece at the from position
-        piece = self.game.get_piece(from_pos)
-        if not piece:
-            return False
-
-        # Check if the piece belongs to the player
-        if piece.color != player_color:
-            return False
-
         # Check if positions are valid
         if not from_pos.is_valid() or not to_pos.is_valid():
             return False
 
+        # Check if there's a piece at the from position that belongs to the player
+        piece = self.game.get_piece(from_pos)
+        if piece is None or piece.color != player_color:
+            return False
+
         # For premoves, we allow any move that could theoretically be valid
         # We don't check if it's currently legal, just if it's a possible move for that piece type
-        return True
+        return to_pos in self._get_theoretical_moves(from_pos, piece)
+
+    async def queue_move(
+        self,
+        websocket: WebSocket,
+        from_pos: Position,
+        to_pos: Position,
+        promotion_str: Optional[str] = None,
+    ) -> None:
+        """Queue a move request to be applied by the room's move task."""
+        await self._enqueue(("move", websocket, from_pos, to_pos, promotion_str))
+
+    async def queue_cancel_premove(self, websocket: WebSocket) -> None:
+        """Queue a premove cancellation behind the player's earlier moves."""
+        await self._enqueue(("cancel_premove", websocket, None, None, None))
+
+    async def _enqueue(self, request: MoveRequest) -> None:
+        """Put a request on the move queue, starting the move task on first use."""
+        if self.move_task is None:
+            self.move_task = asyncio.create_task(self._process_moves())
+        await self.move_queue.put(request)
+
+    async def _process_moves(self) -> None:
+        """Apply queued requests serially, including any premove a move triggers."""
+        while True:
+            kind, websocket, from_pos, to_pos, promotion_str = await self.move_queue.get()
+            try:
+                if kind == "cancel_premove":
+                    await self.cancel_premove(websocket)
+                elif from_pos is not None and to_pos is not None:
+                    await self.handle_move(websocket, from_pos, to_pos, promotion_str)
+            except (RuntimeError, WebSocketDisconnect):
+                pass  # A failed send must not stop move processing for the room
+            except Exception:
+                # Report anything else, but keep applying the room's later moves
+                logger.exception("Error handling move in room %s", self.id)
+            finally:
+                self.move_queue.task_done()
+
+    async def cancel_premove(self, websocket: WebSocket) -> None:
+        """Clear the player's premove, confirming only if one was set."""
+        if self.premoves.pop(websocket, None) is not None:
+            await websocket.send_text(dumps({
+                "type": "premove_cancelled"
+            }))
+
+    async def handle_move(
+        self,
+        websocket: WebSocket,
+        from_pos: Position,
+        to_pos: Position,
+        promotion_str: Optional[str] = None,
+    ) -> None:
+        """Apply a player's move, or store it as a premove if it is not their turn."""
+        # Get player color
+        player_color = self.player_colors.get(websocket)
+        if not player_color:
+            return
+
+        # Check if it's the player's turn
+        if player_color != self.game.current_turn:
+            # Not the player's turn - treat as a premove
+            if self.is_valid_premove(from_pos, to_pos, player_color):
+                # Parse the promotion now; an unknown type falls back to the default
+                premove_promotion = (
+                    PROMOTION_TYPES.get(promotion_str) if isinstance(promotion_str, str) else None
+                )
+
+                # Store the premove (replaces any existing premove)
+                self.premoves[websocket] = Premove(from_pos, to_pos, premove_promotion)
+                await websocket.send_text(dumps({
+                    "type": "premove_set",
+                    "from": {"row": from_pos.row, "col": from_pos.col},
+                    "to": {"row": to_pos.row, "col": to_pos.col}
+                }))
+            else:
+                await websocket.send_text(dumps({
+                    "type": "error",
+                    "message": "Invalid premove"
+                }))
+            return
+
+        # Convert string promotion type to PieceType enum
+        promotion = None
+        if promotion_str:
+            if isinstance(promotion_str, str):
+                promotion = PROMOTION_TYPES.get(promotion_str)
+            if promotion is None:
+                await websocket.send_text(dumps({
+                    "type": "error",
+                    "message": f"Invalid promotion type: {promotion_str}"
+                }))
+                return
+
+        # Attempt to make the move
+        if not self.game.make_move(from_pos, to_pos, promotion):
+            await websocket.send_text(dumps({
+                "type": "error",
+                "message": "Invalid move"
+            }))
+            return
+
+        # Everything sent for this move and a premove it triggers is batched
+        self.outbox = {}
+        try:
+            await self._after_move(websocket)
+        finally:
+            outbox, self.outbox = self.outbox, None
+            await self._send_all([
+                (send, batch_messages(messages)) for send, messages in outbox.items()
+            ])
+
+    async def _after_move(self, websocket: WebSocket) -> None:
+        """Update clocks and players after a move, then play the opponent's premove."""
+        # Subtract time for regular move
+        self.subtract_time_for_move(is_premove=False)
+
+        # Clear the premove for the player who just moved
+        self.premoves.pop(websocket, None)
+
+        # Broadcast updated board state to both players
+        await self.broadcast_board_state()
+
+        # Check for game over (checkmate or stalemate)
+        if await self.finalize_if_over():
+            return
+
+        # Restart time tracking for the next player
+        await self.start_time_tracking()
+
+        # Check if the opponent has a premove; it is cleared whether or not it succeeds
+        premove = self.premoves.pop(self.opponents[websocket], None)
+        if premove is None:
+            return
+
+        # Attempt the premove
+        if self.game.make_move(premove.from_pos, premove.to_pos, premove.promotion):
+            # Subtract time for premove (0.1 seconds)
+            self.subtract_time_for_move(is_premove=True)
+
+            # Broadcast the new board state
+            await self.broadcast_board_state()
+
+            # Check for game over after premove
+            if not await self.finalize_if_over():
+                # Restart time tracking for the next player
+                await self.start_time_tracking()
 
     async def start_time_tracking(self) -> None:
         """Start tracking time for the current player's turn."""
-        self.last_move_time = time.time()
+        self.last_move_time = time.monotonic()
 
         # Cancel previous timeout if exists
         if self.time_update_task:
@@ -537,45 +519,71 @@ class Room:
         """Handle when a player runs out of time."""
         self.game_ended = True
         winner_color = color.opposite()
-        await self.notify_players(json.dumps({
+        self.game_over_message = dumps({
             "type": "game_over",
             "result": f"{winner_color.value} wins on time",
             "is_checkmate": False,
             "is_stalemate": False
-        }))
+        })
+        await self.notify_players(self.game_over_message)
+
+    async def finalize_if_over(self) -> bool:
+        """End the game and notify both players if the last move finished it.
+
+        Returns True when the game is over, False if play continues.
+        """
+        if self.game_over_message is not None:
+            return True  # Already finalized, both players have been notified
+
+        end_state = self.game.get_end_state()
+        if end_state is None:
+            return False
+
+        # Cancel time tracking task
+        if self.time_update_task:
+            self.time_update_task.cancel()
+
+        self.game_ended = True
+        result, is_checkmate, is_stalemate = end_state
+        self.game_over_message = dumps({
+            "type": "game_over",
+            "result": result,
+            "is_checkmate": is_checkmate,
+            "is_stalemate": is_stalemate
+        })
+        await self.notify_players(self.game_over_message)
+        return True
 
     def subtract_time_for_move(self, is_premove: bool = False) -> None:
         """Subtract time from the player who just moved and add increment."""
         if self.last_move_time is None:
             # First move of the game, just set the time
-            self.last_move_time = time.time()
+            self.last_move_time = time.monotonic()
             return
 
-        # Calculate elapsed time since last move
-        current_time = time.time()
-        elapsed = current_time - self.last_move_time
-
         # Get the player who just moved (opposite of current turn since turn already switched)
         player_who_moved = self.game.current_turn.opposite()
 
         if is_premove:
-            # Premove: subtract 0.1 seconds
-            self.time_remaining[player_who_moved] = max(0, round(self.time_remaining[player_who_moved] - 0.1, 1))
+            # Premove: a flat 0.1 seconds, so the clock is not read
+            elapsed = 0.1
         else:
-            # Regular move: subtract elapsed time
-            self.time_remaining[player_who_moved] = max(0, round(self.time_remaining[player_who_moved] - elapsed, 1))
-
-        # Add increment after every move
-        self.time_remaining[player_who_moved] = round(self.time_remaining[player_who_moved] + INCREMENT_SECONDS, 1)
-
-        # Reset last move time to now for the next player
-        self.last_move_time = current_time
+            # Regular move: subtract elapsed time, and reset last move time for the next player
+            current_time = time.monotonic()
+            elapsed = current_time - self.last_move_time
+            self.last_move_time = current_time
+
+        # Subtract elapsed time, then add increment after every move
+        self.time_remaining[player_who_moved] = round(
+            max(0, round(self.time_remaining[player_who_moved] - elapsed, 1)) + INCREMENT_SECONDS, 1
+        )
 
 class ConnectionManager:
     def __init__(self) -> None:
-        self.queue: List[WebSocket] = []
+        self.queue: deque[WebSocket] = deque()  # Waiting players, matched from the left
         self.rooms: Dict[str, Room] = {}
         self.websocket_to_room: Dict[WebSocket, str] = {}
+        self.player_rooms: Dict[WebSocket, Room] = {}  # Direct room lookup for the message loop
         self.pending_names: Dict[WebSocket, str] = {}  # Store names before room is created
 
     async def connect(self, websocket: WebSocket) -> None:
@@ -588,24 +596,27 @@ class ConnectionManager:
         """Try to create a room if there are at least 2 players in queue."""
         # Check if we can create a room
         if len(self.queue) >= 2:
-            player1 = self.queue.pop(0)
-            player2 = self.queue.pop(0)
+            player1 = self.queue.popleft()
+            player2 = self.queue.popleft()
 
             # Validate both connections are still open
-            if player1.client_state.value == 1 and player2.client_state.value == 1:
+            if (
+                player1.client_state == WebSocketState.CONNECTED
+                and player2.client_state == WebSocketState.CONNECTED
+            ):
                 room = Room(player1, player2)
 
                 # Set player names if they were provided
-                if player1 in self.pending_names:
-                    room.set_player_name(player1, self.pending_names[player1])
-                    del self.pending_names[player1]
-                if player2 in self.pending_names:
-                    room.set_player_name(player2, self.pending_names[player2])
-                    del self.pending_names[player2]
+                for player in (player1, player2):
+                    name = self.pending_names.pop(player, None)
+                    if name is not None:
+                        room.set_player_name(player, name)
 
                 self.rooms[room.id] = room
                 self.websocket_to_room[player1] = room.id
                 self.websocket_to_room[player2] = room.id
+                self.player_rooms[player1] = room
+                self.player_rooms[player2] = room
 
                 await room.notify_players(f"Match found! Room ID: {room.id}")
                 await room.broadcast_board_state()
@@ -613,56 +624,57 @@ class ConnectionManager:
                 await room.start_time_tracking()
             else:
                 # Put back valid connections to queue
-                if player1.client_state.value == 1:
-                    self.queue.insert(0, player1)
-                if player2.client_state.value == 1:
-                    self.queue.insert(0, player2)
+                if player1.client_state == WebSocketState.CONNECTED:
+                    self.queue.appendleft(player1)
+                if player2.client_state == WebSocketState.CONNECTED:
+                    self.queue.appendleft(player2)
 
     def set_pending_name(self, websocket: WebSocket, name: str) -> None:
         """Store a player's name while they're in the queue."""
         self.pending_names[websocket] = name if name.strip() else "Guest"
 
     async def disconnect(self, websocket: WebSocket) -> None:
-        # Remove from queue if waiting
-        if websocket in self.queue:
+        # Remove from queue if waiting (one scan instead of a membership test first)
+        try:
             self.queue.remove(websocket)
+        except ValueError:
+            pass
+        else:
             # Clean up pending name
-            if websocket in self.pending_names:
-                del self.pending_names[websocket]
+            self.pending_names.pop(websocket, None)
             return
 
         # Close room if in a room
-        if websocket in self.websocket_to_room:
-            room_id = self.websocket_to_room[websocket]
+        room_id = self.websocket_to_room.get(websocket)
+        if room_id is not None:
             room = self.rooms.get(room_id)
 
             if room:
-                # Cancel time tracking task
+                # Cancel time tracking and move processing tasks
                 if room.time_update_task:
                     room.time_update_task.cancel()
+                if room.move_task:
+                    room.move_task.cancel()
 
                 # Only send resignation message if the game wasn't already over
                 if not room.game.is_game_over() and not room.game_ended:
                     room.game_ended = True
                     # Determine winner (the player who stayed connected)
-                    other_player = room.player2 if websocket == room.player1 else room.player1
-                    winner_color = room.get_player_color(other_player)
+                    other_player = room.opponents[websocket]
+                    winner_color = room.player_colors[other_player]
 
                     # Notify other player of win by resignation (don't close their connection)
                     if winner_color:
                         try:
-                            await other_player.send_text(json.dumps({
-                                "type": "game_over",
-                                "result": f"{winner_color.value} wins by resignation",
-                                "is_checkmate": False,
-                                "is_stalemate": False
-                            }))
+                            await other_player.send_text(RESIGNATION_MESSAGES[winner_color])
                         except:
                             pass
 
                 # Clean up
                 self.websocket_to_room.pop(room.player1, None)
                 self.websocket_to_room.pop(room.player2, None)
+                self.player_rooms.pop(room.player1, None)
+                self.player_rooms.pop(room.player2, None)
                 self.rooms.pop(room_id, None)
 
 manager = ConnectionManager()
@@ -697,13 +709,11 @@ async def websocket_endpoint(websocket: WebSocket) -> None:
                 name = message.get("name", "Guest")
 
                 # Check if player is already in a room
-                room_id = manager.websocket_to_room.get(websocket)
-                if room_id:
-                    room = manager.rooms.get(room_id)
-                    if room:
-                        room.set_player_name(websocket, name)
-                        # Re-broadcast board state with updated name
-                        await room.broadcast_board_state()
+                room = manager.player_rooms.get(websocket)
+                if room:
+                    room.set_player_name(websocket, name)
+                    # Re-broadcast board state with updated name
+                    await room.broadcast_board_state()
                 else:
                     # Player is in queue, store name for later
                     manager.set_pending_name(websocket, name)
@@ -713,172 +723,34 @@ async def websocket_endpoint(websocket: WebSocket) -> None:
 
             # Handle cancel premove requests
             if message.get("type") == "cancel_premove":
-                room_id = manager.websocket_to_room.get(websocket)
-                if not room_id:
-                    continue
-
-                room = manager.rooms.get(room_id)
+                room = manager.player_rooms.get(websocket)
                 if not room:
                     continue
 
-                # Clear the premove for this player if one exists
-                if websocket in room.premoves:
-                    del room.premoves[websocket]
-                    await websocket.send_text(json.dumps({
-                        "type": "premove_cancelled"
-                    }))
+                # Queued behind this player's moves, so a premove sent just before is cancelled too
+                await room.queue_cancel_premove(websocket)
                 continue
 
             # Handle move requests
             if message.get("type") == "move":
-                room_id = manager.websocket_to_room.get(websocket)
-                if not room_id:
-                    continue
-
-                room = manager.rooms.get(room_id)
+                room = manager.player_rooms.get(websocket)
                 if not room:
                     continue
 
-                # Get player color
-                player_color = room.get_player_color(websocket)
-                if not player_color:
-                    continue
-
                 # Parse move positions first to use in premove validation
                 try:
                     from_pos = Position(message["from"]["row"], message["from"]["col"])
                     to_pos = Position(message["to"]["row"], message["to"]["col"])
                     promotion_str = message.get("promotion")  # Optional promotion piece type
                 except (KeyError, TypeError):
-                    await websocket.send_text(json.dumps({
+                    await websocket.send_text(dumps({
                         "type": "error",
                         "message": "Invalid move format"
                     }))
                     continue
 
-                # Check if it's the player's turn
-                if player_color != room.game.current_turn:
-                    # Not the player's turn - treat as a premove
-                    if room.is_valid_premove(from_pos, to_pos, player_color):
-                        # Store the premove (replaces any existing premove)
-                        room.premoves[websocket] = {
-                            "from": message["from"],
-                            "to": message["to"],
-                            "promotion": promotion_str
-                        }
-                        await websocket.send_text(json.dumps({
-                            "type": "premove_set",
-                            "from": message["from"],
-                            "to": message["to"]
-                        }))
-                    else:
-                        await websocket.send_text(json.dumps({
-                            "type": "error",
-                            "message": "Invalid premove"
-                        }))
-                    continue
-
-                # Convert string promotion type to PieceType enum
-                promotion = None
-                if promotion_str:
-                    try:
-                        promotion = PieceType(promotion_str)
-                    except ValueError:
-                        await websocket.send_text(json.dumps({
-                            "type": "error",
-                            "message": f"Invalid promotion type: {promotion_str}"
-                        }))
-                        continue
-
-                # Attempt to make the move
-                success = room.game.make_move(from_pos, to_pos, promotion)
-
-                if success:
-                    # Subtract time for regular move
-                    room.subtract_time_for_move(is_premove=False)
-
-                    # Clear the premove for the player who just moved
-                    if websocket in room.premoves:
-                        del room.premoves[websocket]
-
-                    # Broadcast updated board state to both players
-                    await room.broadcast_board_state()
-
-                    # Check for game over (checkmate or stalemate)
-                    if room.game.is_game_over():
-                        # Cancel time tracking task
-                        if room.time_update_task:
-                            room.time_update_task.cancel()
-
-                        room.game_ended = True
-                        game_result = room.game.get_game_result()
-                        await room.notify_players(json.dumps({
-                            "type": "game_over",
-                            "result": game_result,
-                            "is_checkmate": room.game.is_checkmate(),
-                            "is_stalemate": room.game.is_stalemate()
-                        }))
-                    else:
-                        # Restart time tracking for the next player
-                        await room.start_time_tracking()
-                        # Check if the opponent has a premove
-                        opponent = room.player2 if websocket == room.player1 else room.player1
-                        if opponent in room.premoves:
-                            premove_data = room.premoves[opponent]
-
-                            # Try to execute the premove
-                            try:
-                                premove_from = Position(premove_data["from"]["row"], premove_data["from"]["col"])
-                                premove_to = Position(premove_data["to"]["row"], premove_data["to"]["col"])
-                                premove_promotion_str = premove_data.get("promotion")
-
-                                # Convert promotion string to PieceType if present
-                                premove_promotion = None
-                                if premove_promotion_str:
-                                    try:
-                                        premove_promotion = PieceType(premove_promotion_str)
-                                    except ValueError:
-                                        pass
-
-                                # Attempt the premove
-                                premove_success = room.game.make_move(premove_from, premove_to, premove_promotion)
-
-                                # Clear the premove regardless of success
-                                del room.premoves[opponent]
-
-                                if premove_success:
-                                    # Subtract time for premove (0.1 seconds)
-                                    room.subtract_time_for_move(is_premove=True)
-
-                                    # Broadcast the new board state
-                                    await room.broadcast_board_state()
-
-                                    # Check for game over after premove
-                                    if room.game.is_game_over():
-                                        # Cancel time tracking task
-                                        if room.time_update_task:
-                                            room.time_update_task.cancel()
-
-                                        room.game_ended = True
-                                        game_result = room.game.get_game_result()
-                                        await room.notify_players(json.dumps({
-                                            "type": "game_over",
-                                            "result": game_result,
-                                            "is_checkmate": room.game.is_checkmate(),
-                                            "is_stalemate": room.game.is_stalemate()
-                                        }))
-                                    else:
-                                        # Restart time tracking for the next player
-                                        await room.start_time_tracking()
-                            except (KeyError, TypeError):
-                                # Invalid premove data, just clear it
-                                if opponent in room.premoves:
-                                    del room.premoves[opponent]
-                else:
-                    await websocket.send_text(json.dumps({
-                        "type": "error",
-                        "message": "Invalid move"
-                    }))
+                # Hand the move to the room so moves and premoves apply in arrival order
+                await room.queue_move(websocket, from_pos, to_pos, promotion_str)
 
     except WebSocketDisconnect:
         await manager.disconnect(websocket)
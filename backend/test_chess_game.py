@@ -1,6 +1,11 @@
+import json
+import random
+
 import pytest
 from chess_game import (
-    ChessGame, Position, Piece, PieceType, Color, Move
+    ChessGame, Position, Piece, PieceType, Color, Move, Board,
+    rook_attacks, bishop_attacks, slide_attacks,
+    ORTHOGONAL_DIRECTIONS, DIAGONAL_DIRECTIONS,
 )
 
 
@@ -288,6 +293,20 @@ class TestQueenMoves:
         moves = game.get_possible_moves(Position.from_algebraic(queen_pos))
         assert len(moves) == expected_move_count
 
+    def test_memoized_slider_attacks_match_ray_walk(self):
+        """Test that the memoized slider tables agree with walking the rays."""
+        rng = random.Random(42)
+        for _ in range(200):
+            square = rng.randrange(64)
+            occupied = rng.getrandbits(64)
+            for _ in range(2):  # second pass is served from the cache
+                assert rook_attacks(square, occupied) == slide_attacks(
+                    square, occupied, ORTHOGONAL_DIRECTIONS
+                )
+                assert bishop_attacks(square, occupied) == slide_attacks(
+                    square, occupied, DIAGONAL_DIRECTIONS
+                )
+
 
 class TestKingMoves:
     """Test suite for king movement."""
@@ -465,6 +484,23 @@ class TestMoveExecution:
         assert game.move_history[0].from_pos == Position.from_algebraic("e2")
         assert game.move_history[0].to_pos == Position.from_algebraic("e4")
 
+    def test_packed_move_round_trip(self):
+        """Test that a packed move decodes back to its squares, promotion and flags."""
+        move = Move.pack(
+            Position.from_algebraic("b7"),
+            Position.from_algebraic("b8"),
+            PieceType.DRAGON,
+            is_en_passant=True,
+        )
+
+        assert isinstance(move, int)
+        assert move.from_pos is Position.from_algebraic("b7")
+        assert move.to_pos is Position.from_algebraic("b8")
+        assert move.promotion_piece_type == PieceType.DRAGON
+        assert move.is_en_passant
+        assert not move.is_castling
+        assert Move.pack(Position(0, 0), Position(0, 1)).promotion_piece_type is None
+
     def test_piece_has_moved_flag(self):
         """Test that has_moved flag is set after moving."""
         game = ChessGame()
@@ -609,6 +645,108 @@ class TestGameState:
         game = ChessGame()
         assert game.get_game_result() is None
 
+    def test_get_end_state_checkmate(self):
+        """Test end state reports the result with checkmate flags."""
+        game = ChessGame()
+        game.board.clear()
+        game.board[Position.from_algebraic("h8")] = Piece(PieceType.KING, Color.WHITE)
+        game.board[Position.from_algebraic("a7")] = Piece(PieceType.ROOK, Color.BLACK)
+        game.board[Position.from_algebraic("b8")] = Piece(PieceType.ROOK, Color.BLACK)
+        game.board[Position.from_algebraic("f6")] = Piece(PieceType.KING, Color.BLACK)
+        game.current_turn = Color.WHITE
+
+        assert game.get_end_state() == ("black wins by checkmate", True, False)
+
+    def test_get_end_state_ongoing(self):
+        """Test end state is None for ongoing game."""
+        game = ChessGame()
+        assert game.get_end_state() is None
+
+    def test_has_legal_moves(self):
+        """Test has_legal_moves for a normal and a stalemated position."""
+        game = ChessGame()
+        assert game.has_legal_moves()
+
+        game.board.clear()
+        game.board[Position.from_algebraic("a8")] = Piece(PieceType.KING, Color.BLACK)
+        game.board[Position.from_algebraic("b6")] = Piece(PieceType.QUEEN, Color.WHITE)
+        game.board[Position.from_algebraic("c7")] = Piece(PieceType.KING, Color.WHITE)
+        game.current_turn = Color.BLACK
+        assert not game.has_legal_moves()
+        assert game.is_stalemate()
+
+    def test_can_move(self):
+        """Test can_move agrees with the legal move list."""
+        game = ChessGame()
+        e2 = Position.from_algebraic("e2")
+        assert game.can_move(e2, Position.from_algebraic("e4"))
+        assert not game.can_move(e2, Position.from_algebraic("e5"))
+        assert not game.can_move(Position.from_algebraic("e7"), Position.from_algebraic("e5"))
+
+    def test_legal_move_cache_tracks_position_changes(self):
+        """Test that cached legal moves are refreshed when the position changes."""
+        game = ChessGame()
+        game.board.clear()
+        game.board[Position.from_algebraic("e1")] = Piece(PieceType.KING, Color.WHITE)
+        game.board[Position.from_algebraic("e8")] = Piece(PieceType.KING, Color.BLACK)
+        rook_pos = Position.from_algebraic("a1")
+        game.board[rook_pos] = Piece(PieceType.ROOK, Color.WHITE)
+
+        first = game.get_possible_moves(rook_pos)
+        assert game.get_possible_moves(rook_pos) == first
+        assert Position.from_algebraic("a8") in first
+
+        # Blocking the file must not serve the stale cached result
+        game.board[Position.from_algebraic("a4")] = Piece(PieceType.PAWN, Color.WHITE)
+        assert Position.from_algebraic("a8") not in game.get_possible_moves(rook_pos)
+
+        # Neither may a has_moved change made directly on a piece
+        king_pos = Position.from_algebraic("e1")
+        game.board.pop(Position.from_algebraic("a4"))
+        assert Position.from_algebraic("c1") in game.get_possible_moves(king_pos)
+        game.board[king_pos].has_moved = True
+        assert Position.from_algebraic("c1") not in game.get_possible_moves(king_pos)
+
+    def test_all_possible_moves_matches_per_square_moves(self):
+        """Test that all_possible_moves agrees with get_possible_moves and follows moves."""
+        game = ChessGame()
+        for _ in range(2):
+            expected = {}
+            for pos, piece in game.board.items():
+                if piece.color == game.current_turn:
+                    moves = game.get_possible_moves(pos)
+                    if moves:
+                        expected[pos] = moves
+            assert game.all_possible_moves() == expected
+            from_pos, moves = next(iter(expected.items()))
+            game.make_move(from_pos, moves[0])
+
+    def test_empty_game_and_place(self):
+        """Test that an empty game has no pieces and place puts pieces by notation."""
+        game = ChessGame.empty()
+        assert len(game.board) == 0
+        assert game.current_turn == Color.WHITE
+
+        king = game.place("e1", PieceType.KING, Color.WHITE)
+        assert game.get_piece(Position.from_algebraic("e1")) is king
+        assert king.piece_type == PieceType.KING and not king.has_moved
+        assert game.king_position(Color.WHITE) == Position.from_algebraic("e1")
+
+    def test_board_to_dict_tracks_moves(self):
+        """Test that the memoized board dict and JSON follow the board."""
+        game = ChessGame()
+        board_dict = game.board_to_dict()
+        assert len(board_dict) == 32
+        assert board_dict["1,4"] == {"piece_type": "pawn", "color": "white"}
+        assert game.board_to_dict() is board_dict
+        assert json.loads(game.board_to_json()) == board_dict
+
+        game.make_move(Position.from_algebraic("e2"), Position.from_algebraic("e4"))
+        moved = game.board_to_dict()
+        assert "1,4" not in moved
+        assert moved["3,4"] == {"piece_type": "pawn", "color": "white"}
+        assert json.loads(game.board_to_json()) == moved
+
 
 class TestPieceDisplay:
     """Test suite for piece string representation."""
@@ -652,6 +790,71 @@ class TestPositionHashing:
         position_set = {pos1, pos2, pos3}
         assert len(position_set) == 2  # pos1 and pos2 are equal
 
+    def test_on_board_positions_are_interned(self):
+        """Test that on-board positions are shared instances and off-board ones still work."""
+        assert Position(3, 4) is Position(3, 4)
+        assert Position.from_algebraic("e4") is Position(3, 4)
+        assert Position(3, 3).offset(0, 1) is Position(3, 4)
+
+        off_board = Position(-1, 0)
+        assert not off_board.is_valid()
+        assert off_board == Position(-1, 0)
+
+    def test_position_is_immutable(self):
+        """Test that interned positions cannot be mutated."""
+        with pytest.raises(AttributeError):
+            Position(0, 0).row = 5
+
+
+class TestBoardStorage:
+    """Test suite for the mailbox/bitboard Board."""
+
+    def test_set_and_pop_keep_bitboards_in_sync(self):
+        """Test that mutations update the mailbox and occupancy bitboards together."""
+        board = Board()
+        pos = Position(2, 3)
+        board[pos] = Piece(PieceType.KNIGHT, Color.WHITE)
+
+        assert pos in board
+        assert len(board) == 1
+        assert board.occupancy[Color.WHITE] == 1 << 19
+        assert board.piece_bitboards[(Color.WHITE, PieceType.KNIGHT)] == 1 << 19
+
+        board.pop(pos)
+        assert pos not in board
+        assert len(board) == 0
+        assert board.occupancy[Color.WHITE] == 0
+
+    def test_capture_replaces_occupancy(self):
+        """Test that overwriting a square clears the captured piece's bits."""
+        board = Board()
+        pos = Position(4, 4)
+        board[pos] = Piece(PieceType.PAWN, Color.BLACK)
+        board[pos] = Piece(PieceType.QUEEN, Color.WHITE)
+
+        assert len(board) == 1
+        assert board.occupancy[Color.BLACK] == 0
+        assert board.occupancy[Color.WHITE] == 1 << 36
+
+    def test_off_board_lookups(self):
+        """Test that off-board positions behave like missing keys."""
+        board = Board()
+        assert board.get(Position(-1, 0)) is None
+        assert Position(10, 10) not in board
+        assert board.pop(Position(8, 0), None) is None
+        with pytest.raises(KeyError):
+            board[Position(0, 0)]
+
+    def test_copy_is_independent(self):
+        """Test that a copied board does not share storage with the original."""
+        board = Board()
+        board[Position(0, 0)] = Piece(PieceType.ROOK, Color.WHITE)
+        copy = board.copy()
+        copy.pop(Position(0, 0))
+
+        assert Position(0, 0) in board
+        assert board.occupancy[Color.WHITE] == 1
+
 
 class TestBoardDisplay:
     """Test suite for board display."""
@@ -750,6 +953,20 @@ class TestEmptySquareMoves:
 class TestCheckEdgeCases:
     """Test suite for edge cases in check detection."""
 
+    def test_king_position_follows_the_king(self):
+        """Test that king_position tracks king moves and captures."""
+        game = ChessGame()
+        game.board.clear()
+        game.board[Position.from_algebraic("e1")] = Piece(PieceType.KING, Color.WHITE)
+        game.board[Position.from_algebraic("e8")] = Piece(PieceType.KING, Color.BLACK)
+
+        assert game.king_position(Color.WHITE) == Position.from_algebraic("e1")
+        game.make_move(Position.from_algebraic("e1"), Position.from_algebraic("f2"))
+        assert game.king_position(Color.WHITE) == Position.from_algebraic("f2")
+
+        game.board.pop(Position.from_algebraic("e8"))
+        assert game.king_position(Color.BLACK) is None
+
     def test_is_in_check_with_no_king(self):
         """Test is_in_check when king is missing (edge case)."""
         game = ChessGame()
@@ -761,6 +978,64 @@ class TestCheckEdgeCases:
         assert game.is_in_check(Color.WHITE) is False
         assert game.is_in_check(Color.BLACK) is False
 
+    def test_unicorn_gives_check_from_distance(self):
+        """Test that a nightrider attack along repeated knight steps is detected."""
+        game = ChessGame()
+        game.board.clear()
+        game.board[Position.from_algebraic("a1")] = Piece(PieceType.KING, Color.WHITE)
+        game.board[Position.from_algebraic("e3")] = Piece(PieceType.UNICORN, Color.BLACK)
+        assert game.is_in_check(Color.WHITE)
+
+        # Blocking the intermediate c2 square stops the attack
+        game.board[Position.from_algebraic("c2")] = Piece(PieceType.PAWN, Color.WHITE)
+        assert not game.is_in_check(Color.WHITE)
+
+    def test_elephant_attacks_only_short_diagonals(self):
+        """Test that an elephant attacks up to two diagonal squares and nothing orthogonal."""
+        game = ChessGame()
+        game.board.clear()
+        game.board[Position.from_algebraic("e4")] = Piece(PieceType.ELEPHANT, Color.BLACK)
+
+        assert game._is_position_under_attack(Position.from_algebraic("g6"), Color.WHITE)
+        assert not game._is_position_under_attack(Position.from_algebraic("h7"), Color.WHITE)
+        assert not game._is_position_under_attack(Position.from_algebraic("e5"), Color.WHITE)
+
+    def test_king_cannot_retreat_along_checking_ray(self):
+        """Test that a king can't step away from a slider along the same line."""
+        game = ChessGame()
+        game.board.clear()
+        game.board[Position.from_algebraic("e4")] = Piece(PieceType.KING, Color.WHITE)
+        game.board[Position.from_algebraic("e8")] = Piece(PieceType.ROOK, Color.BLACK)
+        game.board[Position.from_algebraic("a8")] = Piece(PieceType.KING, Color.BLACK)
+
+        moves = game.get_possible_moves(Position.from_algebraic("e4"))
+        assert Position.from_algebraic("e3") not in moves
+        assert Position.from_algebraic("d3") in moves
+
+    def test_pinned_piece_moves_only_along_pin(self):
+        """Test that a pinned piece may only move along the pinning line."""
+        game = ChessGame()
+        game.board.clear()
+        game.board[Position.from_algebraic("e1")] = Piece(PieceType.KING, Color.WHITE)
+        game.board[Position.from_algebraic("e3")] = Piece(PieceType.ROOK, Color.WHITE)
+        game.board[Position.from_algebraic("e7")] = Piece(PieceType.QUEEN, Color.BLACK)
+        game.board[Position.from_algebraic("a8")] = Piece(PieceType.KING, Color.BLACK)
+
+        moves = {pos.to_algebraic() for pos in game.get_possible_moves(Position.from_algebraic("e3"))}
+        assert moves == {"e2", "e4", "e5", "e6", "e7"}
+
+    def test_single_check_must_be_blocked_or_captured(self):
+        """Test that only blocking or capturing moves answer a slider check."""
+        game = ChessGame()
+        game.board.clear()
+        game.board[Position.from_algebraic("e1")] = Piece(PieceType.KING, Color.WHITE)
+        game.board[Position.from_algebraic("a5")] = Piece(PieceType.BISHOP, Color.BLACK)
+        game.board[Position.from_algebraic("b1")] = Piece(PieceType.KNIGHT, Color.WHITE)
+        game.board[Position.from_algebraic("h8")] = Piece(PieceType.KING, Color.BLACK)
+
+        moves = {pos.to_algebraic() for pos in game.get_possible_moves(Position.from_algebraic("b1"))}
+        assert moves == {"c3", "d2"}
+
 
 class TestCheckmateAndStalemateEdgeCases:
     """Test suite for checkmate and stalemate edge cases."""
@@ -1,7 +1,9 @@
 import pytest
 import json
 import asyncio
-from unittest.mock import AsyncMock, MagicMock, patch
+import contextlib
+from unittest.mock import AsyncMock, patch
+from starlette.websockets import WebSocketState
 from main import Room, ConnectionManager
 from chess_game import ChessGame, Position, Piece, PieceType, Color
 
@@ -10,8 +12,7 @@ class MockWebSocket:
     """Mock WebSocket for testing."""
     def __init__(self):
         self.messages_sent = []
-        self.client_state = MagicMock()
-        self.client_state.value = 1  # CONNECTED state
+        self.client_state = WebSocketState.CONNECTED
 
     async def send_text(self, message: str) -> None:
         """Store messages sent through this websocket."""
@@ -119,6 +120,26 @@ class TestRoom:
         # Both should have the same room_id
         assert msg1["room_id"] == msg2["room_id"]
 
+    @pytest.mark.asyncio
+    async def test_broadcast_shares_common_fields_between_players(self):
+        """Test that the shared part of the board state is identical for both players."""
+        player1 = MockWebSocket()
+        player2 = MockWebSocket()
+        room = Room(player1, player2)
+        room.game.make_move(Position.from_algebraic("e2"), Position.from_algebraic("e4"))
+
+        await room.broadcast_board_state()
+
+        msg1 = json.loads(player1.messages_sent[0])
+        msg2 = json.loads(player2.messages_sent[0])
+
+        for key in ("type", "board", "current_turn", "room_id", "white_time",
+                    "black_time", "captured_pieces", "last_move"):
+            assert msg1[key] == msg2[key]
+        assert msg1["last_move"] == {"from": {"row": 1, "col": 4}, "to": {"row": 3, "col": 4}}
+        assert "premove_available_moves" in msg1
+        assert "available_moves" in msg2
+
     @pytest.mark.asyncio
     async def test_broadcast_includes_available_moves_for_current_player(self):
         """Test that available moves are only sent to the player whose turn it is."""
@@ -138,6 +159,56 @@ class TestRoom:
         # Black should not have available_moves since it's not their turn
         assert "available_moves" not in msg2
 
+    @pytest.mark.asyncio
+    async def test_broadcast_packs_available_moves(self):
+        """Test that packed available moves decode to exactly the legal moves."""
+        player1 = MockWebSocket()
+        player2 = MockWebSocket()
+        room = Room(player1, player2)
+
+        await room.broadcast_board_state()
+
+        msg = json.loads(player1.messages_sent[0])
+        decoded = {}
+        for packed in msg["available_moves"]:
+            from_square, to_square = packed & 63, (packed >> 6) & 63
+            decoded.setdefault(Position(from_square // 8, from_square % 8), set()).add(
+                Position(to_square // 8, to_square % 8)
+            )
+        expected = {}
+        for pos, piece in room.game.board.items():
+            if piece.color == Color.WHITE and room.game.get_possible_moves(pos):
+                expected[pos] = set(room.game.get_possible_moves(pos))
+        assert decoded == expected
+
+    @pytest.mark.asyncio
+    async def test_broadcast_sends_board_changes_after_first_board(self):
+        """Test that later broadcasts only carry the squares that changed."""
+        player1 = MockWebSocket()
+        player2 = MockWebSocket()
+        room = Room(player1, player2)
+
+        await room.broadcast_board_state()
+        room.game.make_move(Position.from_algebraic("e2"), Position.from_algebraic("e4"))
+        await room.broadcast_board_state()
+
+        for player in (player1, player2):
+            first = json.loads(player.messages_sent[0])
+            second = json.loads(player.messages_sent[1])
+            assert "board" not in second
+            assert second["board_changes"] == {
+                "1,4": None,
+                "3,4": {"piece_type": "pawn", "color": "white"},
+            }
+
+            board = dict(first["board"])
+            for key, piece in second["board_changes"].items():
+                if piece is None:
+                    del board[key]
+                else:
+                    board[key] = piece
+            assert board == room.game.board_to_dict()
+
     @pytest.mark.asyncio
     async def test_broadcast_board_state_initial_pieces(self):
         """Test that broadcast includes all initial pieces."""
@@ -225,6 +296,8 @@ class TestConnectionManager:
         room_id2 = manager.websocket_to_room.get(player2)
         assert room_id1 is not None
         assert room_id1 == room_id2
+        assert manager.player_rooms[player1] is manager.rooms[room_id1]
+        assert manager.player_rooms[player2] is manager.rooms[room_id1]
 
         # Both players should have received match notification and board state
         assert len(player1.messages_sent) >= 2  # "Waiting..." and "Match found!"
@@ -297,6 +370,8 @@ class TestConnectionManager:
         # Both players should be removed from websocket mapping
         assert player1 not in manager.websocket_to_room
         assert player2 not in manager.websocket_to_room
+        assert player1 not in manager.player_rooms
+        assert player2 not in manager.player_rooms
 
     @pytest.mark.asyncio
     async def test_connect_skips_disconnected_players(self):
@@ -307,7 +382,7 @@ class TestConnectionManager:
         player3 = MockWebSocket()
 
         # Simulate player1 being disconnected
-        player1.client_state.value = 0  # Disconnected
+        player1.client_state = WebSocketState.DISCONNECTED
 
         await manager.connect(player1)
         await manager.connect(player2)
@@ -335,14 +410,13 @@ class TestChessGameEdgeCases:
 
     def test_cannot_castle_through_check(self):
         """Test that king cannot castle through a square under attack."""
-        game = ChessGame()
-        game.board.clear()
+        game = ChessGame.empty()
 
         # Set up minimal board: kings and rooks
-        game.board[Position.from_algebraic("e1")] = Piece(PieceType.KING, Color.WHITE)
-        game.board[Position.from_algebraic("h1")] = Piece(PieceType.ROOK, Color.WHITE)
-        game.board[Position.from_algebraic("e8")] = Piece(PieceType.KING, Color.BLACK)
-        game.board[Position.from_algebraic("f8")] = Piece(PieceType.ROOK, Color.BLACK)
+        game.place("e1", PieceType.KING, Color.WHITE)
+        game.place("h1", PieceType.ROOK, Color.WHITE)
+        game.place("e8", PieceType.KING, Color.BLACK)
+        game.place("f8", PieceType.ROOK, Color.BLACK)
         game.current_turn = Color.WHITE
 
         # Black rook on f8 attacks f1 (the square king passes through)
@@ -354,14 +428,13 @@ class TestChessGameEdgeCases:
 
     def test_cannot_castle_while_in_check(self):
         """Test that king cannot castle while in check."""
-        game = ChessGame()
-        game.board.clear()
+        game = ChessGame.empty()
 
         # Set up minimal board
-        game.board[Position.from_algebraic("e1")] = Piece(PieceType.KING, Color.WHITE)
-        game.board[Position.from_algebraic("h1")] = Piece(PieceType.ROOK, Color.WHITE)
-        game.board[Position.from_algebraic("e8")] = Piece(PieceType.ROOK, Color.BLACK)
-        game.board[Position.from_algebraic("h8")] = Piece(PieceType.KING, Color.BLACK)
+        game.place("e1", PieceType.KING, Color.WHITE)
+        game.place("h1", PieceType.ROOK, Color.WHITE)
+        game.place("e8", PieceType.ROOK, Color.BLACK)
+        game.place("h8", PieceType.KING, Color.BLACK)
         game.current_turn = Color.WHITE
 
         # Black rook on e8 puts white king in check
@@ -373,13 +446,12 @@ class TestChessGameEdgeCases:
 
     def test_pinned_piece_cannot_move(self):
         """Test that a pinned piece has limited or no moves."""
-        game = ChessGame()
-        game.board.clear()
+        game = ChessGame.empty()
 
         # Set up a pin: White king on e1, white bishop on e3, black rook on e8
-        game.board[Position.from_algebraic("e1")] = Piece(PieceType.KING, Color.WHITE)
-        game.board[Position.from_algebraic("e3")] = Piece(PieceType.BISHOP, Color.WHITE)
-        game.board[Position.from_algebraic("e8")] = Piece(PieceType.ROOK, Color.BLACK)
+        game.place("e1", PieceType.KING, Color.WHITE)
+        game.place("e3", PieceType.BISHOP, Color.WHITE)
+        game.place("e8", PieceType.ROOK, Color.BLACK)
         game.current_turn = Color.WHITE
 
         # Bishop is pinned - it can only move along the e-file or not at all
@@ -395,12 +467,11 @@ class TestChessGameEdgeCases:
 
     def test_capture_updates_board(self):
         """Test that capturing properly removes the captured piece."""
-        game = ChessGame()
+        game = ChessGame.empty()
 
         # Set up a capture scenario
-        game.board.clear()
-        game.board[Position.from_algebraic("e4")] = Piece(PieceType.PAWN, Color.WHITE)
-        game.board[Position.from_algebraic("d5")] = Piece(PieceType.PAWN, Color.BLACK)
+        game.place("e4", PieceType.PAWN, Color.WHITE)
+        game.place("d5", PieceType.PAWN, Color.BLACK)
         game.current_turn = Color.WHITE
 
         # Move pawn to capture
@@ -445,11 +516,10 @@ class TestChessGameEdgeCases:
 
     def test_pawn_cannot_move_backward(self):
         """Test that pawns cannot move backward."""
-        game = ChessGame()
-        game.board.clear()
+        game = ChessGame.empty()
 
         # White pawn on e4
-        game.board[Position.from_algebraic("e4")] = Piece(PieceType.PAWN, Color.WHITE, has_moved=True)
+        game.place("e4", PieceType.PAWN, Color.WHITE).has_moved = True
         game.current_turn = Color.WHITE
 
         moves = game.get_possible_moves(Position.from_algebraic("e4"))
@@ -460,11 +530,10 @@ class TestChessGameEdgeCases:
 
     def test_king_cannot_move_adjacent_to_enemy_king(self):
         """Test that kings cannot move next to each other."""
-        game = ChessGame()
-        game.board.clear()
+        game = ChessGame.empty()
 
-        game.board[Position.from_algebraic("e4")] = Piece(PieceType.KING, Color.WHITE)
-        game.board[Position.from_algebraic("e6")] = Piece(PieceType.KING, Color.BLACK)
+        game.place("e4", PieceType.KING, Color.WHITE)
+        game.place("e6", PieceType.KING, Color.BLACK)
         game.current_turn = Color.WHITE
 
         moves = game.get_possible_moves(Position.from_algebraic("e4"))
@@ -495,14 +564,13 @@ class TestChessGameEdgeCases:
         BY the opponent of the given color. So by_color=WHITE means checking if position
         is attacked by BLACK.
         """
-        game = ChessGame()
-        game.board.clear()
+        game = ChessGame.empty()
 
         # Set up position where d4 is attacked by multiple black pieces
-        game.board[Position.from_algebraic("a1")] = Piece(PieceType.KING, Color.WHITE)
-        game.board[Position.from_algebraic("d1")] = Piece(PieceType.ROOK, Color.BLACK)
-        game.board[Position.from_algebraic("d7")] = Piece(PieceType.ROOK, Color.BLACK)
-        game.board[Position.from_algebraic("a4")] = Piece(PieceType.ROOK, Color.BLACK)
+        game.place("a1", PieceType.KING, Color.WHITE)
+        game.place("d1", PieceType.ROOK, Color.BLACK)
+        game.place("d7", PieceType.ROOK, Color.BLACK)
+        game.place("a4", PieceType.ROOK, Color.BLACK)
 
         # d4 should be under attack by Black (so pass WHITE as by_color)
         is_attacked = game._is_position_under_attack(Position.from_algebraic("d4"), Color.WHITE)
@@ -631,6 +699,17 @@ class TestRoomExtended:
 
         assert not room.is_valid_premove(from_pos, to_pos, Color.WHITE)
 
+    def test_is_valid_premove_with_unreachable_square(self):
+        """Test is_valid_premove rejects a square the piece could never move to."""
+        player1 = MockWebSocket()
+        player2 = MockWebSocket()
+        room = Room(player1, player2)
+
+        from_pos = Position.from_algebraic("e2")
+        to_pos = Position.from_algebraic("e6")  # Pawns never move three squares
+
+        assert not room.is_valid_premove(from_pos, to_pos, Color.WHITE)
+
     def test_get_theoretical_moves_pawn(self):
         """Test _get_theoretical_moves for pawns."""
         player1 = MockWebSocket()
@@ -911,8 +990,9 @@ class TestRoomExtended:
         await room.start_time_tracking()
         second_task = room.time_update_task
 
-        # Give time for cancellation to process
-        await asyncio.sleep(0.01)
+        # Wait for the cancellation to be processed
+        with contextlib.suppress(asyncio.CancelledError):
+            await first_task
 
         assert first_task.cancelled()
         assert second_task is not first_task
@@ -931,7 +1011,7 @@ class TestRoomExtended:
         await room.start_time_tracking()
 
         # Wait for timeout
-        await asyncio.sleep(0.05)
+        await room.time_update_task
 
         # Game should be ended
         assert room.game_ended
@@ -949,6 +1029,207 @@ class TestRoomExtended:
 
         assert game_over_found
 
+    @pytest.mark.asyncio
+    async def test_finalize_if_over_ongoing_game(self):
+        """Test finalize_if_over leaves an ongoing game untouched."""
+        player1 = MockWebSocket()
+        player2 = MockWebSocket()
+        room = Room(player1, player2)
+
+        assert await room.finalize_if_over() is False
+        assert not room.game_ended
+        assert len(player1.messages_sent) == 0
+
+    @pytest.mark.asyncio
+    async def test_finalize_if_over_checkmate(self):
+        """Test finalize_if_over ends the game and notifies both players."""
+        player1 = MockWebSocket()
+        player2 = MockWebSocket()
+        room = Room(player1, player2)
+
+        room.game.board.clear()
+        room.game.board[Position.from_algebraic("h8")] = Piece(PieceType.KING, Color.WHITE)
+        room.game.board[Position.from_algebraic("a7")] = Piece(PieceType.ROOK, Color.BLACK)
+        room.game.board[Position.from_algebraic("b8")] = Piece(PieceType.ROOK, Color.BLACK)
+        room.game.board[Position.from_algebraic("f6")] = Piece(PieceType.KING, Color.BLACK)
+        room.game.current_turn = Color.WHITE
+
+        await room.start_time_tracking()
+        task = room.time_update_task
+
+        assert await room.finalize_if_over() is True
+        assert room.game_ended
+
+        # Wait for the cancellation to be processed
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        assert task.cancelled()
+
+        for player in (player1, player2):
+            msg = json.loads(player.messages_sent[-1])
+            assert msg["type"] == "game_over"
+            assert msg["result"] == "black wins by checkmate"
+            assert msg["is_checkmate"] is True
+            assert msg["is_stalemate"] is False
+
+        # A second call reuses the finished state without notifying again
+        assert await room.finalize_if_over() is True
+        assert len(player1.messages_sent) == 1
+        assert room.game_over_message == player2.messages_sent[0]
+
+    @pytest.mark.asyncio
+    async def test_queue_move_applies_moves_in_order(self):
+        """Test queued moves are applied one after another by the room's move task."""
+        player1 = MockWebSocket()
+        player2 = MockWebSocket()
+        room = Room(player1, player2)
+
+        await room.queue_move(player1, Position.from_algebraic("e2"), Position.from_algebraic("e4"))
+        await room.queue_move(player2, Position.from_algebraic("e7"), Position.from_algebraic("e5"))
+        await room.move_queue.join()
+
+        assert room.game.get_piece(Position.from_algebraic("e4")).piece_type == PieceType.PAWN
+        assert room.game.get_piece(Position.from_algebraic("e5")).piece_type == PieceType.PAWN
+        assert room.game.current_turn == Color.WHITE
+
+        room.move_task.cancel()
+        room.time_update_task.cancel()
+
+    @pytest.mark.asyncio
+    async def test_queued_cancel_premove_follows_queued_premove(self):
+        """Test that a cancel sent right after an out-of-turn move cancels that premove."""
+        player1 = MockWebSocket()
+        player2 = MockWebSocket()
+        room = Room(player1, player2)
+
+        await room.queue_move(player2, Position.from_algebraic("e7"), Position.from_algebraic("e5"))
+        await room.queue_cancel_premove(player2)
+        await room.queue_move(player1, Position.from_algebraic("e2"), Position.from_algebraic("e4"))
+        await room.move_queue.join()
+
+        assert player2 not in room.premoves
+        assert json.loads(player2.messages_sent[0])["type"] == "premove_set"
+        assert json.loads(player2.messages_sent[1])["type"] == "premove_cancelled"
+
+        # The cancelled premove was not played after white's move
+        assert room.game.get_piece(Position.from_algebraic("e7")).piece_type == PieceType.PAWN
+        assert room.game.get_piece(Position.from_algebraic("e5")) is None
+        assert room.game.current_turn == Color.BLACK
+
+        room.move_task.cancel()
+        room.time_update_task.cancel()
+
+    @pytest.mark.asyncio
+    async def test_queue_move_reports_errors_and_keeps_processing(self, caplog):
+        """Test that an error while handling a move is logged and later moves still apply."""
+        player1 = MockWebSocket()
+        player2 = MockWebSocket()
+        room = Room(player1, player2)
+
+        handle_move = room.handle_move
+        failures = [KeyError("bad game state")]
+
+        async def fail_once(*args):
+            if failures:
+                raise failures.pop()
+            await handle_move(*args)
+
+        room.handle_move = fail_once
+
+        await room.queue_move(player1, Position.from_algebraic("d2"), Position.from_algebraic("d4"))
+        await room.queue_move(player1, Position.from_algebraic("e2"), Position.from_algebraic("e4"))
+        await room.move_queue.join()
+
+        assert "Error handling move" in caplog.text
+        assert "bad game state" in caplog.text
+        assert not room.move_task.done()
+        assert room.game.get_piece(Position.from_algebraic("e4")).piece_type == PieceType.PAWN
+        assert room.game.current_turn == Color.BLACK
+
+        room.move_task.cancel()
+        room.time_update_task.cancel()
+
+    @pytest.mark.asyncio
+    async def test_handle_move_stores_premove(self):
+        """Test that a move sent out of turn is stored as a premove."""
+        player1 = MockWebSocket()
+        player2 = MockWebSocket()
+        room = Room(player1, player2)
+
+        await room.handle_move(player2, Position.from_algebraic("e7"), Position.from_algebraic("e5"))
+
+        premove = room.premoves[player2]
+        assert premove.from_pos == Position.from_algebraic("e7")
+        assert premove.to_pos == Position.from_algebraic("e5")
+        msg = json.loads(player2.messages_sent[-1])
+        assert msg["type"] == "premove_set"
+        assert msg["from"] == {"row": 6, "col": 4}
+
+    @pytest.mark.asyncio
+    async def test_handle_move_executes_opponent_premove(self):
+        """Test that the opponent's premove is played right after a move."""
+        player1 = MockWebSocket()
+        player2 = MockWebSocket()
+        room = Room(player1, player2)
+
+        await room.handle_move(player2, Position.from_algebraic("e7"), Position.from_algebraic("e5"))
+        await room.handle_move(player1, Position.from_algebraic("e2"), Position.from_algebraic("e4"))
+
+        assert player2 not in room.premoves
+        assert room.game.get_piece(Position.from_algebraic("e5")).color == Color.BLACK
+        assert room.game.current_turn == Color.WHITE
+
+        room.time_update_task.cancel()
+
+    @pytest.mark.asyncio
+    async def test_handle_move_batches_premove_updates(self):
+        """Test that a move and the premove it triggers reach each player as one frame."""
+        player1 = MockWebSocket()
+        player2 = MockWebSocket()
+        room = Room(player1, player2)
+
+        await room.handle_move(player2, Position.from_algebraic("e7"), Position.from_algebraic("e5"))
+        player2.messages_sent.clear()
+        await room.handle_move(player1, Position.from_algebraic("e2"), Position.from_algebraic("e4"))
+
+        for player in (player1, player2):
+            assert len(player.messages_sent) == 1
+            msg = json.loads(player.messages_sent[0])
+            assert msg["type"] == "multi"
+            assert [event["type"] for event in msg["events"]] == ["board_state", "board_state"]
+            assert msg["events"][-1]["current_turn"] == "white"
+        assert room.outbox is None
+
+        room.time_update_task.cancel()
+
+    @pytest.mark.asyncio
+    async def test_handle_move_sends_single_update_unwrapped(self):
+        """Test that a move without follow-up events is sent as a plain board state."""
+        player1 = MockWebSocket()
+        player2 = MockWebSocket()
+        room = Room(player1, player2)
+
+        await room.handle_move(player1, Position.from_algebraic("e2"), Position.from_algebraic("e4"))
+
+        for player in (player1, player2):
+            assert len(player.messages_sent) == 1
+            assert json.loads(player.messages_sent[0])["type"] == "board_state"
+
+        room.time_update_task.cancel()
+
+    @pytest.mark.asyncio
+    async def test_handle_move_invalid_move(self):
+        """Test that an illegal move is rejected with an error."""
+        player1 = MockWebSocket()
+        player2 = MockWebSocket()
+        room = Room(player1, player2)
+
+        await room.handle_move(player1, Position.from_algebraic("e2"), Position.from_algebraic("e5"))
+
+        msg = json.loads(player1.messages_sent[-1])
+        assert msg == {"type": "error", "message": "Invalid move"}
+        assert room.game.current_turn == Color.WHITE
+
     def test_subtract_time_first_move(self):
         """Test subtract_time_for_move on first move."""
         player1 = MockWebSocket()
@@ -969,7 +1250,7 @@ class TestRoomExtended:
 
         import time
         initial_time = room.time_remaining[Color.WHITE]
-        room.last_move_time = time.time() - 2.0  # Simulate 2 seconds ago
+        room.last_move_time = time.monotonic() - 2.0  # Simulate 2 seconds ago
         room.game.current_turn = Color.BLACK  # White just moved
 
         room.subtract_time_for_move(is_premove=False)
@@ -986,11 +1267,14 @@ class TestRoomExtended:
 
         import time
         initial_time = room.time_remaining[Color.WHITE]
-        room.last_move_time = time.time()
+        room.last_move_time = last_move_time = time.monotonic()
         room.game.current_turn = Color.BLACK  # White just moved
 
         room.subtract_time_for_move(is_premove=True)
 
+        # A premove is charged a flat amount without reading the clock
+        assert room.last_move_time == last_move_time
+
         # White should have lost 0.1 seconds but gained increment
         # Lost 0.1, gained 3 (INCREMENT_SECONDS) = net +2.9
         expected = initial_time - 0.1 + 3.0
@@ -1068,7 +1352,7 @@ class TestConnectionManagerExtended:
         player2 = MockWebSocket()
 
         # Player1 is disconnected
-        player1.client_state.value = 0
+        player1.client_state = WebSocketState.DISCONNECTED
 
         manager.queue.append(player1)
         manager.queue.append(player2)
@@ -1090,7 +1374,7 @@ class TestConnectionManagerExtended:
         player2 = MockWebSocket()
 
         # Player2 is disconnected, player1 is connected
-        player2.client_state.value = 0
+        player2.client_state = WebSocketState.DISCONNECTED
 
         manager.queue.append(player1)
         manager.queue.append(player2)
@@ -1124,8 +1408,9 @@ class TestConnectionManagerExtended:
         # Disconnect
         await manager.disconnect(player1)
 
-        # Give time for cancellation to process
-        await asyncio.sleep(0.01)
+        # Wait for the cancellation to be processed
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
 
         # Task should be cancelled
         assert task.cancelled()
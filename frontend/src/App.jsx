@@ -10,6 +10,19 @@ function formatTime(seconds) {
   return `${mins}:${secs.toString().padStart(2, "0")}.${tenths}`;
 }
 
+// Helper function to unpack moves sent as ints (from square in bits 0-5,
+// to square in bits 6-11) into { "row,col": [{ row, col }, ...] } by origin
+function unpackMoves(packedMoves) {
+  const moves = {};
+  for (const packed of packedMoves) {
+    const from = packed & 63;
+    const to = (packed >> 6) & 63;
+    const key = `${from >> 3},${from & 7}`;
+    (moves[key] ||= []).push({ row: to >> 3, col: to & 7 });
+  }
+  return moves;
+}
+
 // Helper function to calculate net captured pieces
 // Returns only pieces that give a material advantage (cancels out matching captures)
 // allCapturedPieces.white = white pieces captured by black
@@ -441,6 +454,7 @@ function App() {
   const reconnectTimeoutRef = useRef(null);
   const boardRef = useRef(null);
   const previousBoardStateRef = useRef(null);
+  const serverBoardRef = useRef(null); // Last board sent by the server, base for board_changes
   const whiteStartTimeRef = useRef(null);
   const blackStartTimeRef = useRef(null);
   const whiteInitialTimeRef = useRef(180.0);
@@ -1241,49 +1255,73 @@ function App() {
       console.log("Message received:", event.data);
 
       try {
-        const data = JSON.parse(event.data);
-        if (data.type === "board_state") {
-          const previousTurn = boardState?.current_turn;
-          setBoardState(data);
-          setGameState("playing");
-
-          // Set opponent name if provided
-          if (data.opponent_name) {
-            setOpponentName(data.opponent_name);
-          }
+        const message = JSON.parse(event.data);
+        // Events produced by a single move may arrive batched in one frame
+        const events = message.type === "multi" ? message.events : [message];
+        for (const data of events) {
+          if (data.type === "board_state") {
+            const previousTurn = boardState?.current_turn;
+            // After the first board of a game the server only sends changed squares
+            if (data.board_changes) {
+              const board = { ...serverBoardRef.current };
+              for (const [key, piece] of Object.entries(data.board_changes)) {
+                if (piece === null) {
+                  delete board[key];
+                } else {
+                  board[key] = piece;
+                }
+              }
+              data.board = board;
+              delete data.board_changes;
+            }
+            serverBoardRef.current = data.board;
+            if (data.available_moves) {
+              data.available_moves = unpackMoves(data.available_moves);
+            }
+            if (data.premove_available_moves) {
+              data.premove_available_moves = unpackMoves(data.premove_available_moves);
+            }
+            setBoardState(data);
+            setGameState("playing");
 
-          // Update timer initial values from server
-          if (data.white_time !== undefined) {
-            whiteInitialTimeRef.current = data.white_time;
-            // Only update display time for the non-active player
-            if (data.current_turn !== "white") {
-              setWhiteTime(data.white_time);
+            // Set opponent name if provided
+            if (data.opponent_name) {
+              setOpponentName(data.opponent_name);
             }
-          }
-          if (data.black_time !== undefined) {
-            blackInitialTimeRef.current = data.black_time;
-            // Only update display time for the non-active player
-            if (data.current_turn !== "black") {
-              setBlackTime(data.black_time);
+
+            // Update timer initial values from server
+            if (data.white_time !== undefined) {
+              whiteInitialTimeRef.current = data.white_time;
+              // Only update display time for the non-active player
+              if (data.current_turn !== "white") {
+                setWhiteTime(data.white_time);
+              }
+            }
+            if (data.black_time !== undefined) {
+              blackInitialTimeRef.current = data.black_time;
+              // Only update display time for the non-active player
+              if (data.current_turn !== "black") {
+                setBlackTime(data.black_time);
+              }
             }
-          }
 
-          // Reset start time when turn changes or on initial board state
-          if (previousTurn !== data.current_turn || !previousTurn) {
-            if (data.current_turn === "white") {
-              whiteStartTimeRef.current = Date.now();
-              blackStartTimeRef.current = null;
-            } else {
-              blackStartTimeRef.current = Date.now();
-              whiteStartTimeRef.current = null;
+            // Reset start time when turn changes or on initial board state
+            if (previousTurn !== data.current_turn || !previousTurn) {
+              if (data.current_turn === "white") {
+                whiteStartTimeRef.current = Date.now();
+                blackStartTimeRef.current = null;
+              } else {
+                blackStartTimeRef.current = Date.now();
+                whiteStartTimeRef.current = null;
+              }
             }
+          } else if (data.type === "game_over") {
+            setGameOver({
+              result: data.result,
+              is_checkmate: data.is_checkmate,
+              is_stalemate: data.is_stalemate,
+            });
           }
-        } else if (data.type === "game_over") {
-          setGameOver({
-            result: data.result,
-            is_checkmate: data.is_checkmate,
-            is_stalemate: data.is_stalemate,
-          });
         }
       } catch (e) {
         // Text message (e.g., "Waiting for opponent...")